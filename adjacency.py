@@ -0,0 +1,64 @@
+"""Neighbourhood kernels shared by scoring cards, mountain coins and monsters.
+
+Array kernels work on the last two axes of (..., cols, rows) masks, so single
+boards and batches of boards go through the same code. The bit kernels
+(bit_adjacent is bitboard.adjacent) do the same for masks in the bit layout of
+bitboard.BitBoard with a few shifts for the whole board. Either way "cells
+next to X" and "cells surrounded by X" cost a handful of operations instead
+of a Python loop over cells.
+
+Off the map, neighbours are taken to be fill, so surrounded(filled) counts
+the map edge as filled and adjacent(mask) does not count it at all.
+"""
+
+import numpy as np
+
+from bitboard import adjacent as bit_adjacent, masks
+
+DIRECTIONS = [(1, 0), (0, 1), (-1, 0), (0, -1)]
+
+
+def _window(length, offset):
+    return slice(max(0, offset), length + min(0, offset))
+
+
+def shift(mask, dx, dy, fill=False):
+    """out[..., col, row] = mask[..., col + dx, row + dy], fill off the map."""
+    cols, rows = mask.shape[-2:]
+    out = np.full_like(mask, fill)
+    out[..., _window(cols, -dx), _window(rows, -dy)] = mask[
+        ..., _window(cols, dx), _window(rows, dy)
+    ]
+    return out
+
+
+def neighbour_masks(mask, fill=False):
+    """Per direction the cells whose neighbour that way is set in mask."""
+    return [shift(mask, dx, dy, fill) for dx, dy in DIRECTIONS]
+
+
+def adjacent(mask, at_least=1, fill=False):
+    """Cells with at least at_least orthogonal neighbours set in mask."""
+    if at_least == 1:
+        return np.logical_or.reduce(neighbour_masks(mask, fill))
+    count = np.zeros(mask.shape, dtype=np.uint8)
+    for neighbour in neighbour_masks(mask, fill):
+        count += neighbour
+    return count >= at_least
+
+
+def surrounded(mask, fill=True):
+    """Cells all four neighbours of which are set in mask."""
+    return np.logical_and.reduce(neighbour_masks(mask, fill))
+
+
+def adjacent_to(boards, tile_type, other_type):
+    """Cells of tile_type with at least one neighbour of other_type."""
+    boards = np.asarray(boards)
+    return (boards == tile_type) & adjacent(boards == other_type)
+
+
+def bit_surrounded(mask, size):
+    """Cells whose neighbours on the board are all set in a bit mask."""
+    full = masks(size).full
+    return full & ~bit_adjacent(full & ~mask, size)
@@ -0,0 +1,89 @@
+"""Image asset cache.
+
+Every image is decoded and scaled at most once per target size, the first time
+it is asked for. Tiles and their semi-transparent preview variants are packed
+into one atlas surface. Optionally the scaled pixels are persisted to a cache
+directory, keyed by source path, modification time and target size, so later
+starts skip decoding and scaling entirely.
+"""
+
+import hashlib
+import os
+import pygame
+
+# directory for pre-scaled images, caching on disk is off if unset
+CACHE_DIR = os.environ.get("CARTOGRAPHERS_ASSET_CACHE")
+PREVIEW_ALPHA = 128
+
+
+class AssetManager:
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._images = {}
+        self._atlases = {}
+
+    def _cache_path(self, path, size):
+        stat = os.stat(path)
+        key = f"{os.path.abspath(path)}:{stat.st_mtime_ns}:{size[0]}x{size[1]}"
+        return os.path.join(
+            self.cache_dir, hashlib.sha1(key.encode()).hexdigest() + ".rgba"
+        )
+
+    def _load_from_disk(self, path, size):
+        cache_path = self._cache_path(path, size)
+        if os.path.exists(cache_path):
+            with open(cache_path, "rb") as cache_file:
+                pixels = cache_file.read()
+            if len(pixels) == size[0] * size[1] * 4:
+                return pygame.image.frombytes(pixels, size, "RGBA")
+
+        image = pygame.transform.scale(pygame.image.load(path), size)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(cache_path, "wb") as cache_file:
+            cache_file.write(pygame.image.tobytes(image, "RGBA"))
+        return image
+
+    def load(self, path, size, alpha=None):
+        """Image at path scaled to size, optionally with a surface alpha."""
+        key = (path, size, alpha)
+        if key not in self._images:
+            if alpha is not None:
+                image = self.load(path, size).copy()
+                image.set_alpha(alpha)
+            elif self.cache_dir:
+                image = self._load_from_disk(path, size)
+            else:
+                image = pygame.transform.scale(pygame.image.load(path), size)
+            self._images[key] = image
+        return self._images[key]
+
+    def tile_atlas(self, tiles, directory, size):
+        """Pack tiles into one surface: images in the top row, previews below.
+
+        Sets tile.img and tile.img_prev of every tile to subsurfaces of the
+        atlas and returns the tiles keyed by their value.
+        """
+        paths = tuple(os.path.join(directory, tile.image_name) for tile in tiles)
+        key = (paths, size)
+        if key not in self._atlases:
+            atlas = pygame.Surface((size * len(tiles), size * 2), pygame.SRCALPHA)
+            for i, path in enumerate(paths):
+                image = self.load(path, (size, size))
+                atlas.blit(image, (i * size, 0))
+                atlas.blit(image, (i * size, size))
+            # halve the alpha of the preview row only
+            atlas.fill(
+                (255, 255, 255, PREVIEW_ALPHA),
+                (0, size, size * len(tiles), size),
+                special_flags=pygame.BLEND_RGBA_MULT,
+            )
+            self._atlases[key] = atlas
+
+        atlas = self._atlases[key]
+        for i, tile in enumerate(tiles):
+            tile.img = atlas.subsurface((i * size, 0, size, size))
+            tile.img_prev = atlas.subsurface((i * size, size, size, size))
+        return {tile.val: tile for tile in tiles}
+
+
+ASSETS = AssetManager()
@@ -0,0 +1,342 @@
+"""Reproducible benchmarks of the rules, scoring and rendering hot paths.
+
+    python benchmarks.py --output bench.json [--filter scoring] [--repeat 5]
+
+Every benchmark is calibrated to run for at least MIN_TIME per round and is
+repeated a few times; best and mean time per call are reported in
+microseconds. Boards are generated from fixed seeds, and rendering runs on the
+SDL dummy video driver, so results are comparable across commits.
+"""
+
+import argparse
+import copy
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+import bitboard
+import scoring_algorithms
+from cards import SCORING_CARDS
+from decks import DeckEngine
+from engine import GameEngine, deal_game
+from policies import make_policy
+from tiles import MOUNTAINS, TILES_DICT, MapLayout, init_normal_board
+from vector_env import N_PLACEMENTS, PASS, VectorEnv
+
+MIN_TIME = 0.05  # seconds per round
+REPEAT = 5
+SEED = 0
+BATCH = 1024
+LARGE_SIZES = [100, 1000]
+
+SCORING_FUNCTIONS = ["borderlands", "wildholds", "canallake", "sentinelwood"]
+
+
+def _filled_board(tile_type):
+    board = init_normal_board()
+    for column in board:
+        for row, tile in enumerate(column):
+            if tile == 0:
+                column[row] = tile_type
+    return board
+
+
+def random_board(rng):
+    board = init_normal_board()
+    fill = rng.random()
+    for column in board:
+        for row, tile in enumerate(column):
+            if tile == 0 and rng.random() < fill:
+                column[row] = rng.randint(1, 5)
+    return board
+
+
+def checker_board():
+    # every water cell touches farms and the other way round
+    board = init_normal_board()
+    for col, column in enumerate(board):
+        for row, tile in enumerate(column):
+            if tile == 0:
+                column[row] = (
+                    TILES_DICT["water"].val
+                    if (col + row) % 2
+                    else TILES_DICT["farm"].val
+                )
+    return board
+
+
+def boards():
+    return {
+        "empty": init_normal_board(),
+        "random": random_board(random.Random(SEED)),
+        "villages": _filled_board(TILES_DICT["village"].val),
+        "forest": _filled_board(TILES_DICT["forest"].val),
+        "checker": checker_board(),
+    }
+
+
+def _round(func, make_arg, number):
+    if make_arg is None:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        return time.perf_counter() - start
+    args = [make_arg() for _ in range(number)]
+    start = time.perf_counter()
+    for arg in args:
+        func(arg)
+    return time.perf_counter() - start
+
+
+def measure(func, make_arg=None, repeat=REPEAT):
+    """Time func() (or func(make_arg()) with untimed setup) per call."""
+    number = 1
+    while True:
+        elapsed = _round(func, make_arg, number)
+        if elapsed >= MIN_TIME or number >= 1 << 20:
+            break
+        number *= 10 if elapsed < MIN_TIME / 10 else 2
+    times = [elapsed] + [_round(func, make_arg, number) for _ in range(repeat - 1)]
+    per_call = [t / number * 1e6 for t in times]
+    return {
+        "number": number,
+        "repeat": repeat,
+        "best_us": min(per_call),
+        "mean_us": sum(per_call) / len(per_call),
+    }
+
+
+def scoring_benchmarks():
+    for board_name, board in boards().items():
+        bits = bitboard.BitBoard.from_board(board)
+        for name in SCORING_FUNCTIONS:
+            function = getattr(scoring_algorithms, "score_" + name)
+            bit_function = getattr(bitboard, "score_" + name)
+            yield f"scoring.{name}.{board_name}", lambda f=function, b=board: f(b)
+            yield f"bitboard.{name}.{board_name}", lambda f=bit_function, b=bits: f(b)
+
+    rng = random.Random(SEED)
+    batch = np.array([random_board(rng) for _ in range(BATCH)], dtype=np.uint8)
+    for name in SCORING_FUNCTIONS:
+        function = getattr(scoring_algorithms, "batch_score_" + name)
+        yield f"batch.{name}.random{BATCH}", lambda f=function: f(batch)
+    board = boards()["random"]
+    for stack in SCORING_CARDS.values():
+        for card in stack:
+            name = card.name.lower().replace(" ", "_")
+            yield f"card.{name}.random{BATCH}", lambda c=card: c.batch_score(batch)
+            # single board scoring without and with a warm score cache
+            memoized = copy.copy(card)
+            memoized.memoize()
+            yield f"card.{name}.random", lambda c=card: c.score(board)
+            yield f"card.{name}.cached", lambda c=memoized: c.score(board)
+
+
+def _midgame_engine():
+    engine = GameEngine(SEED)
+    policy = make_policy("random", SEED)
+    for _ in range(10):
+        engine.step(policy.choose(engine))
+    return engine
+
+
+def rules_benchmarks():
+    engine = _midgame_engine()
+    yield "rules.legal_actions", lambda: list(engine.legal_actions())
+
+    def circled_engine():
+        circled = engine.copy()
+        for col, row in MOUNTAINS:
+            for dx, dy in [(1, 0), (0, 1), (-1, 0), (0, -1)]:
+                if circled.board[col + dx][row + dy] == 0:
+                    circled.board[col + dx][row + dy] = TILES_DICT["farm"].val
+                    circled.occupied |= bitboard.bit(col + dx, row + dy)
+        return circled
+
+    yield "rules.check_mountain_coins.open", engine._check_mountain_coins
+    yield "rules.check_mountain_coins.circled", (
+        lambda circled: circled._check_mountain_coins(),
+        circled_engine,
+    )
+
+    # one lookahead move: playing it on a copy or playing and taking it back
+    action = next(engine.legal_actions())
+
+    def step_undo():
+        engine.step(action)
+        engine.undo()
+
+    yield "rules.lookahead.copy", lambda: engine.copy().step(action)
+    yield "rules.lookahead.undo", step_undo
+
+    def random_game():
+        game = GameEngine(SEED)
+        policy = make_policy("random", SEED)
+        while not game.done:
+            game.step(policy.choose(game))
+
+    yield "rules.random_game", random_game
+
+    deck_engine = DeckEngine(SEED)
+    games = np.arange(BATCH)
+    yield f"rules.deal.python{BATCH}", lambda: [
+        deal_game(seed) for seed in range(BATCH)
+    ]
+    yield f"rules.deal.numpy{BATCH}", lambda: deck_engine.deal_arrays(games)
+
+    def vector_random_games():
+        # BATCH random games in lockstep, compare with rules.random_game
+        env = VectorEnv(BATCH, SEED, autoreset=False)
+        rng = np.random.default_rng(SEED)
+        _, info = env.reset()
+        while not env.done.all():
+            placements = info["placement_mask"]
+            types = info["type_mask"]
+            placement = (rng.random(placements.shape) * placements).argmax(axis=1)
+            type_index = (rng.random(types.shape) * types).argmax(axis=1)
+            actions = np.where(
+                placements.any(axis=1), type_index * N_PLACEMENTS + placement, PASS
+            )
+            _, _, _, _, info = env.step(actions)
+
+    yield f"rules.vector_env.random_games{BATCH}", vector_random_games
+
+
+def ui_benchmarks():
+    import pygame
+    from board import (
+        GameState,
+        init_explore_card_images,
+        init_scoring_card_images,
+    )
+
+    pygame.init()
+    gs = GameState(_midgame_engine())
+    gs.set_edicts(init_scoring_card_images(gs.engine.edicts))
+    gs.set_season(gs.engine.season)
+    init_explore_card_images(gs.engine.explore_cards + [gs.engine.explore_card])
+    gs.update_explore_card(gs.engine.explore_card)
+    dm = gs.draw_manager
+    dm.update_board_screen()
+
+    yield "ui.tiles_overlap", dm.tiles_overlap
+    yield "ui.rotate_shape", dm.rotate_shape
+    yield "ui.flip_shape", dm.flip_shape
+
+    def legal_engine():
+        engine = gs.engine.copy()
+        action = next(engine.legal_actions())
+        return engine, action
+
+    def place(arg):
+        gs.engine, action = arg
+        gs.show_action(action)
+        dm.place_tiles()
+
+    yield "ui.place_tiles", (place, legal_engine)
+
+    def full_redraw():
+        dm.invalidate()
+        dm.update_board_screen()
+
+    moves = [(1, 0), (-1, 0)]
+
+    def hover_redraw():
+        gs.hover_pos = dm.move_shape(moves[0])
+        moves.reverse()
+        dm.update_board_screen()
+
+    yield "ui.update_board_screen.full", full_redraw
+    yield "ui.update_board_screen.hover", hover_redraw
+
+
+def scale_benchmarks():
+    for size in LARGE_SIZES:
+        layout = MapLayout.tiled(size)
+        rng = np.random.default_rng(SEED)
+        board = rng.integers(0, 6, (size, size), dtype=np.uint8).tolist()
+        for name in SCORING_FUNCTIONS:
+            function = getattr(scoring_algorithms, "score_" + name)
+            yield f"scale.{name}.{size}", lambda f=function, b=board: f(b)
+        engine = GameEngine(SEED, layout=layout)
+        yield f"scale.engine_init.{size}", lambda l=layout: GameEngine(SEED, layout=l)
+        yield f"scale.has_legal_action.{size}", engine.has_legal_action
+        yield f"scale.step.{size}", (
+            lambda game: game.step(next(game.legal_actions())),
+            engine.copy,
+        )
+
+
+GROUPS = {
+    "scoring": scoring_benchmarks,
+    "rules": rules_benchmarks,
+    "ui": ui_benchmarks,
+    "scale": scale_benchmarks,
+}
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(groups, name_filter=None, repeat=REPEAT):
+    results = {}
+    for group in groups:
+        for name, benchmark in GROUPS[group]():
+            if name_filter and name_filter not in name:
+                continue
+            func, make_arg = (
+                benchmark if isinstance(benchmark, tuple) else (benchmark, None)
+            )
+            results[name] = measure(func, make_arg, repeat)
+            print(f"{name:45} {results[name]['best_us']:12.2f} us", file=sys.stderr)
+    return {
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        # only loaded for the ui group
+        "pygame": (
+            sys.modules["pygame"].version.ver if "pygame" in sys.modules else None
+        ),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    parser.add_argument(
+        "--group", action="append", choices=sorted(GROUPS), help="default: all"
+    )
+    parser.add_argument("--filter", help="only benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    args = parser.parse_args(argv)
+    if args.output:
+        # relative to where the benchmarks were started, not the repository
+        args.output = os.path.abspath(args.output)
+
+    # images are loaded relative to the repository, rendering needs no display
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    report = run(args.group or list(GROUPS), args.filter, args.repeat)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+
+if __name__ == "__main__":
+    main()
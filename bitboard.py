@@ -0,0 +1,219 @@
+"""Bitboard board representation.
+
+Every terrain is stored as one Python integer with one bit per cell, bit
+`col * size + row` standing for `board[col][row]`. Overlap tests, placement,
+neighbourhoods and the scoring algorithms become shifts and masks instead of
+Python loops over the 121 cells.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from tiles import MOUNTAINS, NR_OF_TILES, TILES_DICT
+
+# masks with more bits than this are unpacked with numpy instead of bit by bit
+_UNPACK_BITS = 4096
+
+
+def from_array(array):
+    """Mask of the true cells of a (cols, rows) bool array."""
+    packed = np.packbits(np.asarray(array, dtype=bool).ravel(), bitorder="little")
+    return int.from_bytes(packed.tobytes(), "little")
+
+
+def to_array(mask, size):
+    """(cols, rows) bool array of a mask, the opposite of from_array."""
+    data = np.frombuffer(mask.to_bytes((size * size + 7) // 8, "little"), np.uint8)
+    cells = np.unpackbits(data, count=size * size, bitorder="little")
+    return cells.reshape(size, size).astype(bool)
+
+
+def set_bits(mask):
+    """Indices of the set bits of mask in ascending order."""
+    if mask.bit_length() <= _UNPACK_BITS:
+        indices = []
+        while mask:
+            low = mask & -mask
+            indices.append(low.bit_length() - 1)
+            mask ^= low
+        return indices
+    data = np.frombuffer(
+        mask.to_bytes((mask.bit_length() + 7) // 8, "little"), np.uint8
+    )
+    return np.flatnonzero(np.unpackbits(data, bitorder="little")).tolist()
+
+
+class Masks:
+    def __init__(self, size):
+        self.size = size
+        self.full = (1 << size * size) - 1
+        first_row = np.zeros((size, size), dtype=bool)
+        first_row[:, 0] = True
+        self.first_row = from_array(first_row)
+        self.last_row = self.first_row << (size - 1)
+        self.first_col = (1 << size) - 1
+        self.last_col = self.first_col << (size - 1) * size
+        self.edge = self.first_col | self.last_col | self.first_row | self.last_row
+
+
+# every Masks holds a few board sized integers, keep the sizes in use
+@lru_cache(maxsize=16)
+def masks(size=NR_OF_TILES):
+    return Masks(size)
+
+
+def bit(col, row, size=NR_OF_TILES):
+    return 1 << (col * size + row)
+
+
+def popcount(mask):
+    return bin(mask).count("1")
+
+
+def adjacent(mask, size=NR_OF_TILES):
+    """Cells orthogonally adjacent to any cell of mask.
+
+    Cells of mask are only included if they touch another cell of mask.
+    """
+    m = masks(size)
+    return (
+        ((mask << 1) & ~m.first_row)
+        | ((mask >> 1) & ~m.last_row)
+        | (mask << size)
+        | (mask >> size)
+    ) & m.full
+
+
+def neighbours(mask, size=NR_OF_TILES):
+    """Cells outside mask orthogonally adjacent to any cell of it."""
+    return adjacent(mask, size) & ~mask
+
+
+def flood_fill(seed, region, size=NR_OF_TILES):
+    """Grow seed inside region until it covers the whole connected component."""
+    cluster = seed
+    while True:
+        grown = (cluster | neighbours(cluster, size)) & region
+        if grown == cluster:
+            return cluster
+        cluster = grown
+
+
+def clusters(region, size=NR_OF_TILES):
+    """Yield the connected components of region as masks."""
+    while region:
+        cluster = flood_fill(region & -region, region, size)
+        region &= ~cluster
+        yield cluster
+
+
+class BitBoard:
+    def __init__(self, size=NR_OF_TILES):
+        self.size = size
+        self.terrain = [0] * len(TILES_DICT)
+
+    @classmethod
+    def from_board(cls, board):
+        array = np.asarray(board)
+        bitboard = cls(len(array))
+        for tile_type in np.unique(array):
+            if tile_type:
+                bitboard.terrain[tile_type] = from_array(array == tile_type)
+        return bitboard
+
+    @classmethod
+    def normal_board(cls):
+        bitboard = cls()
+        for mountain in MOUNTAINS:
+            bitboard.terrain[TILES_DICT["mountain"].val] |= bit(*mountain)
+        return bitboard
+
+    def to_board(self):
+        board = [[0 for _ in range(self.size)] for _ in range(self.size)]
+        for tile_type, mask in enumerate(self.terrain):
+            for index in set_bits(mask):
+                col, row = divmod(index, self.size)
+                board[col][row] = tile_type
+        return board
+
+    def copy(self):
+        bitboard = BitBoard(self.size)
+        bitboard.terrain = self.terrain.copy()
+        return bitboard
+
+    @property
+    def occupied(self):
+        occupied = 0
+        for mask in self.terrain:
+            occupied |= mask
+        return occupied
+
+    def cell(self, col, row):
+        cell_bit = bit(col, row, self.size)
+        for tile_type, mask in enumerate(self.terrain):
+            if mask & cell_bit:
+                return tile_type
+        return 0
+
+    def shape_mask(self, cells):
+        """Mask of the given (col, row) cells, None if any is off the board."""
+        mask = 0
+        for col, row in cells:
+            if not (0 <= col < self.size and 0 <= row < self.size):
+                return None
+            mask |= bit(col, row, self.size)
+        return mask
+
+    def overlaps(self, mask):
+        return bool(self.occupied & mask)
+
+    def place(self, mask, tile_type):
+        self.terrain[tile_type] |= mask
+
+    def mountain_circled(self, mountain):
+        around = neighbours(bit(*mountain, self.size), self.size)
+        return around & self.occupied == around
+
+
+def full_lines(mask, size=NR_OF_TILES):
+    """Number of rows and columns whose cells are all in mask."""
+    if size * size > _UNPACK_BITS:
+        cells = to_array(mask, size)
+        return int(
+            np.count_nonzero(cells.all(axis=0)) + np.count_nonzero(cells.all(axis=1))
+        )
+    # walk the columns from the low bits, the full rows are in every column
+    line = (1 << size) - 1
+    rows, count = line, 0
+    for _ in range(size):
+        column = mask & line
+        rows &= column
+        count += column == line
+        mask >>= size
+    return count + popcount(rows)
+
+
+def score_borderlands(bitboard):
+    return full_lines(bitboard.occupied, bitboard.size) * 6
+
+
+def score_wildholds(bitboard):
+    villages = bitboard.terrain[TILES_DICT["village"].val]
+    # 8 points for each cluster of 6 or more villages
+    return sum(
+        8 for cluster in clusters(villages, bitboard.size) if popcount(cluster) >= 6
+    )
+
+
+def score_canallake(bitboard):
+    water = bitboard.terrain[TILES_DICT["water"].val]
+    farm = bitboard.terrain[TILES_DICT["farm"].val]
+    return popcount(water & neighbours(farm, bitboard.size)) + popcount(
+        farm & neighbours(water, bitboard.size)
+    )
+
+
+def score_sentinelwood(bitboard):
+    forest = bitboard.terrain[TILES_DICT["forest"].val]
+    return popcount(forest & masks(bitboard.size).edge)
@@ -1,29 +1,24 @@
+import copy
 import os
+import time
 import pygame
 
-
-class Tile:
-    def __init__(self, value, image_name):
-        self.val = value
-        self.image_name = image_name
-
-
-TILES_DICT = {
-    "empty": Tile(0, "white.png"),
-    "water": Tile(1, "water.png"),
-    "farm": Tile(2, "farm.png"),
-    "village": Tile(3, "village.png"),
-    "forest": Tile(4, "forest.png"),
-    "monster": Tile(5, "monster.png"),
-    "mountain": Tile(6, "mountain.png"),
-}
+from assets import ASSETS
+from bot import Bot
+from engine import Action, GameEngine
+from incremental import RescoreTracker
+from profiling import PROFILER
+from shapes import flip_orientation, orientation_table, rotate_orientation
+from tiles import NR_OF_TILES, TILES_DICT
 
 
 class Window:
     # Constants for the board size
-    NR_OF_TILES = 11
+    NR_OF_TILES = NR_OF_TILES  # cells across the board view at the default zoom
     TILE_SIZE = 40  # Size of the square tile
     BOARD_SIZE = NR_OF_TILES * TILE_SIZE
+    # tile sizes to zoom through, each divides BOARD_SIZE
+    ZOOM_LEVELS = (40, 20, 10, 8, 5, 4, 2)
     CARD_SIZE = (200, 300)
     SPACING = 10
 
@@ -38,6 +33,9 @@ class Window:
     )
     FONT_SIZE = 36
 
+    FPS = 60  # upper bound for redraws per second
+    EVENT_TIMEOUT = 500  # ms to block waiting for input before draw_board returns
+
 
 # Create the window
 def init_screen():
@@ -48,28 +46,43 @@ def init_screen():
     return screen
 
 
-def load_scoring_card(name, alpha=False):
-    path = os.path.join("images", "scoring_cards", name)
-    image = pygame.transform.scale(pygame.image.load(path), Window.CARD_SIZE)
-    if alpha:
-        image.set_alpha(128)  # Set semi-transparent
+def placeholder_card(title, alpha=None):
+    """Plain card showing its title, for cards without an image."""
+    card = pygame.Surface(Window.CARD_SIZE)
+    card.fill((255, 255, 255))
+    pygame.draw.rect(card, (0, 0, 0), card.get_rect(), 2)
+    font = pygame.font.Font(None, Window.FONT_SIZE * 2 // 3)
+    text = font.render(title, True, (0, 0, 0))
+    card.blit(text, text.get_rect(center=card.get_rect().center))
+    if alpha is not None:
+        card.set_alpha(alpha)
+    return card
 
-    return image
+
+def load_scoring_card(name, alpha=False, title=None):
+    path = os.path.join("images", "scoring_cards", name)
+    # semi-transparent for edicts that are not active
+    alpha = 128 if alpha else None
+    if not os.path.exists(path):
+        return placeholder_card(title or name, alpha)
+    return ASSETS.load(path, Window.CARD_SIZE, alpha)
 
 
 def init_scoring_card_images(edicts):
     for _, scoring_card in edicts.items():
-        scoring_card.img = load_scoring_card(scoring_card.image_path)
-        scoring_card.img_prev = load_scoring_card(scoring_card.image_path, alpha=True)
+        scoring_card.img = load_scoring_card(
+            scoring_card.image_path, title=scoring_card.name
+        )
+        scoring_card.img_prev = load_scoring_card(
+            scoring_card.image_path, alpha=True, title=scoring_card.name
+        )
 
     return edicts
 
 
 def load_explore_card(name):
     path = os.path.join("images", "explore_cards", name)
-    image = pygame.transform.scale(pygame.image.load(path), Window.CARD_SIZE)
-
-    return image
+    return ASSETS.load(path, Window.CARD_SIZE)
 
 
 def init_explore_card_images(cards):
@@ -79,42 +92,28 @@ def init_explore_card_images(cards):
     return cards
 
 
-# Load tile images
-def load_tile(name, alpha=False):
-    path = os.path.join("images", "tiles", "basic", name)
-    image = pygame.transform.scale(
-        pygame.image.load(path), (Window.TILE_SIZE, Window.TILE_SIZE)
+def init_tiles(tiles_dict, tile_size=Window.TILE_SIZE):
+    """Tile images keyed by tile value, decoded on first use only."""
+    return ASSETS.tile_atlas(
+        list(tiles_dict.values()),
+        os.path.join("images", "tiles", "basic"),
+        tile_size,
     )
-    if alpha:
-        image.set_alpha(128)  # Set semi-transparent
-
-    return image
-
-
-def init_tiles(tiles_dict):
-    tiles = {}
-    for _, tile in tiles_dict.items():
-        tile.img = load_tile(tile.image_name)
-        tile.img_prev = load_tile(tile.image_name, alpha=True)
-        tiles[tile.val] = tile
-    return tiles
-
-
-TILES = init_tiles(TILES_DICT)
-
-MOUNTAINS = [(3, 1), (8, 2), (5, 5), (2, 8), (7, 9)]
-
-
-def init_normal_board():
-    board = [[0 for _ in range(Window.NR_OF_TILES)] for _ in range(Window.NR_OF_TILES)]
-    for mountain in MOUNTAINS:
-        board[mountain[0]][mountain[1]] = 6
-    return board
 
 
 class DrawManager:
     def __init__(self, game_state):
         self.gs = game_state
+        self.tile_size = Window.TILE_SIZE
+        self.tiles = init_tiles(TILES_DICT, self.tile_size)
+        self.view = (0, 0)  # board cell shown in the top left corner
+        self.board_surface = None
+        self._drawn_board = None
+        self._drawn_view = None
+        self._drawn_preview = []
+        self._labels = {}
+        self._dirty_rects = []
+        self._full_redraw = True
 
     def _shape_out_of_bound(self, hover_pos, shape):
         """Hover position not going out of bounds"""
@@ -125,8 +124,8 @@ class DrawManager:
         if (
             min_x_offset < 0
             or min_y_offset < 0
-            or max_x_offset >= Window.NR_OF_TILES
-            or max_y_offset >= Window.NR_OF_TILES
+            or max_x_offset >= self.gs.size
+            or max_y_offset >= self.gs.size
         ):
             return True
         return False
@@ -137,7 +136,7 @@ class DrawManager:
                 self.gs.hover_pos[0] + rel_pos[0],
                 self.gs.hover_pos[1] + rel_pos[1],
             )
-            if 0 <= col < Window.NR_OF_TILES and 0 <= row < Window.NR_OF_TILES:
+            if 0 <= col < self.gs.size and 0 <= row < self.gs.size:
                 # Check if a tile already exists at this position
                 if self.gs.board[col][row] != 0:
                     return True
@@ -164,79 +163,99 @@ class DrawManager:
                     1 - self.gs.explore_card_shape_pointer
                 )
             else:
-                self.gs.selected_shape = new_shape
+                self.gs.set_orientation(0)
+
+    def _show_text(self, name, text, location, width, font_size=Window.FONT_SIZE):
+        """Render a text label, skipped if it still shows the same text."""
+        if self._labels.get(name) == text:
+            return
+        self._labels[name] = text
+        font = pygame.font.Font(None, font_size)
+        text_surface = font.render(text, True, (0, 0, 0), (255, 255, 255))
+        fill_rect = (location[0], location[1], width, font_size)
+        self.gs.screen.fill((255, 255, 255), fill_rect)
+        self.gs.screen.blit(text_surface, location)
+        self.invalidate(fill_rect)
 
     def show_season(self):
-        font = pygame.font.Font(None, Window.FONT_SIZE)
-        text_surface = font.render(
-            f"{self.gs.season.name}",
-            True,
-            (0, 0, 0),
-            (255, 255, 255),
-        )
         text_location = (
             Window.BOARD_SIZE + Window.SPACING * 2,
             Window.CARD_SIZE[1] * 2 + Window.SPACING * 3,
         )
-        fill_rect = (
-            text_location[0],
-            text_location[1],
-            Window.CARD_SIZE[0],
-            Window.FONT_SIZE,
+        self._show_text(
+            "season", f"{self.gs.season.name}", text_location, Window.CARD_SIZE[0]
         )
-        self.gs.screen.fill((255, 255, 255), fill_rect)
-        self.gs.screen.blit(text_surface, text_location)
 
     def show_remaining_time(self):
-        font = pygame.font.Font(None, Window.FONT_SIZE)
         time_left = max(
             0, self.gs.season.time - self.gs.timecost - self.gs.explore_card.timecost
         )
-        text_surface = font.render(
-            f"Time left: {time_left}",
-            True,
-            (0, 0, 0),
-            (255, 255, 255),
+        text_location = (
+            Window.BOARD_SIZE + Window.SPACING * 2,
+            Window.CARD_SIZE[1] * 2 + Window.SPACING * 3 + Window.FONT_SIZE,
         )
-        self.gs.screen.blit(
-            text_surface,
-            (
-                Window.BOARD_SIZE + Window.SPACING * 2,
-                Window.CARD_SIZE[1] * 2 + Window.SPACING * 3 + Window.FONT_SIZE,
-            ),
+        self._show_text(
+            "time", f"Time left: {time_left}", text_location, Window.CARD_SIZE[0]
         )
 
     def show_coins(self):
-        font = pygame.font.Font(None, Window.FONT_SIZE)
-        text_surface = font.render(
-            f"Coins: {self.gs.coins}",
-            True,
-            (0, 0, 0),
-            (255, 255, 255),
+        text_location = (
+            Window.BOARD_SIZE + Window.SPACING * 2,
+            Window.CARD_SIZE[1] * 2 + Window.SPACING * 3 + Window.FONT_SIZE * 2,
         )
-        self.gs.screen.blit(
-            text_surface,
-            (
-                Window.BOARD_SIZE + Window.SPACING * 2,
-                Window.CARD_SIZE[1] * 2 + Window.SPACING * 3 + Window.FONT_SIZE * 2,
-            ),
+        self._show_text(
+            "coins", f"Coins: {self.gs.coins}", text_location, Window.CARD_SIZE[0]
         )
 
-    def rotate_shape(self, clockwise=True):
-        if clockwise:
-            new_positions = [(-pos[1], pos[0]) for pos in self.gs.selected_shape]
-        else:
-            new_positions = [(pos[1], -pos[0]) for pos in self.gs.selected_shape]
+    def show_score_preview(self):
+        """Running edict scores and what placing the hovered shape would add."""
+        scorer = self.gs.engine.scorer
+        scores = scorer.scores
+        delta = {}
+        if not self.tiles_overlap():
+            cells = [
+                (self.gs.hover_pos[0] + rel_pos[0], self.gs.hover_pos[1] + rel_pos[1])
+                for rel_pos in self.gs.selected_shape
+            ]
+            delta = scorer.delta(cells, self.gs.selected_tile_type)
+        text = "  ".join(
+            f"{key}: {scores[key]} (+{delta.get(key, 0)})"
+            for key in self.gs.season.edicts
+        )
+        text_location = (
+            Window.BOARD_SIZE + Window.SPACING * 2,
+            Window.CARD_SIZE[1] * 2 + Window.SPACING * 3 + Window.FONT_SIZE * 3,
+        )
+        self._show_text(
+            "score", text, text_location, Window.WINDOW_SIZE[0] - text_location[0]
+        )
+
+    def show_hint_stats(self, nodes, nodes_per_second):
+        """How much the hint bot searched, right of the explore card."""
+        font_size = Window.FONT_SIZE * 2 // 3
+        x = Window.EXPLORE_CARD_LOCATION[0] + Window.CARD_SIZE[0] + Window.SPACING
+        y = Window.EXPLORE_CARD_LOCATION[1]
+        width = Window.WINDOW_SIZE[0] - x
+        lines = [f"Hint: {nodes} pos.", f"{nodes_per_second:.0f} pos./s"]
+        for index, line in enumerate(lines):
+            self._show_text(
+                f"hint{index}", line, (x, y + index * font_size), width, font_size
+            )
 
-        if self._shape_out_of_bound(self.gs.hover_pos, new_positions):
-            return self.gs.selected_shape
-        return new_positions
+    def _reorient(self, orientation):
+        """Orientation to switch to, the current one if it would go out of bounds."""
+        shape = self.gs.explore_card.shapes[self.gs.explore_card_shape_pointer]
+        if self._shape_out_of_bound(
+            self.gs.hover_pos, orientation_table(shape)[orientation]
+        ):
+            return self.gs.orientation
+        return orientation
+
+    def rotate_shape(self, clockwise=True):
+        return self._reorient(rotate_orientation(self.gs.orientation, clockwise))
 
     def flip_shape(self):
-        new_positions = [(-pos[0], pos[1]) for pos in self.gs.selected_shape]
-        if self._shape_out_of_bound(self.gs.hover_pos, new_positions):
-            return self.gs.selected_shape
-        return new_positions
+        return self._reorient(flip_orientation(self.gs.orientation))
 
     def move_shape(self, new_pos_relative):
         new_hover_pos = (
@@ -248,48 +267,133 @@ class DrawManager:
         return self.gs.hover_pos
 
     def place_tiles(self):
-        for rel_pos in self.gs.selected_shape:
-            col, row = (
-                self.gs.hover_pos[0] + rel_pos[0],
-                self.gs.hover_pos[1] + rel_pos[1],
-            )
-            self.gs.board[col][row] = self.gs.selected_tile_type
+        self.gs.engine.step(self.gs.current_action())
+
+    @property
+    def view_tiles(self):
+        """Number of cells across the board view at the current zoom."""
+        return Window.BOARD_SIZE // self.tile_size
+
+    def zoom(self, step):
+        """Show larger (step > 0) or smaller tiles, never more than the board."""
+        levels = [
+            tile_size
+            for tile_size in Window.ZOOM_LEVELS
+            if Window.BOARD_SIZE // tile_size <= self.gs.size
+        ] or [Window.TILE_SIZE]
+        index = levels.index(self.tile_size) if self.tile_size in levels else 0
+        tile_size = levels[min(max(index - step, 0), len(levels) - 1)]
+        if tile_size != self.tile_size:
+            self.tile_size = tile_size
+            self.tiles = init_tiles(TILES_DICT, tile_size)
+
+    def _scroll_to_hover(self):
+        """Move the view so it shows the hovered shape, centred if it was off."""
+        view_tiles = self.view_tiles
+        cols = [self.gs.hover_pos[0] + rel_pos[0] for rel_pos in self.gs.selected_shape]
+        rows = [self.gs.hover_pos[1] + rel_pos[1] for rel_pos in self.gs.selected_shape]
+        col, row = self.view
+        if min(cols) < col or max(cols) >= col + view_tiles:
+            col = self.gs.hover_pos[0] - view_tiles // 2
+        if min(rows) < row or max(rows) >= row + view_tiles:
+            row = self.gs.hover_pos[1] - view_tiles // 2
+        last = self.gs.size - view_tiles
+        self.view = (min(max(col, 0), last), min(max(row, 0), last))
+
+    def _tile_rect(self, col, row):
+        return pygame.Rect(
+            (col - self.view[0]) * self.tile_size + Window.BOARD_LOCATION[0],
+            (row - self.view[1]) * self.tile_size + Window.BOARD_LOCATION[1],
+            self.tile_size,
+            self.tile_size,
+        )
 
-    def _draw_preview(self):
+    def _preview_cells(self):
+        cells = []
         for rel_pos in self.gs.selected_shape:
             preview_col, preview_row = (
                 self.gs.hover_pos[0] + rel_pos[0],
                 self.gs.hover_pos[1] + rel_pos[1],
             )
             if (
-                0 <= preview_col < Window.NR_OF_TILES
-                and 0 <= preview_row < Window.NR_OF_TILES
+                0 <= preview_col - self.view[0] < self.view_tiles
+                and 0 <= preview_row - self.view[1] < self.view_tiles
             ):
-                preview_tile = (
-                    preview_col * Window.TILE_SIZE + Window.BOARD_LOCATION[0],
-                    preview_row * Window.TILE_SIZE + Window.BOARD_LOCATION[1],
-                )
-                self.gs.screen.blit(
-                    TILES[self.gs.selected_tile_type].img_prev, preview_tile
-                )
+                cells.append((preview_col, preview_row))
+        return cells
+
+    def _draw_preview(self, cells):
+        for col, row in cells:
+            self.gs.screen.blit(
+                self.tiles[self.gs.selected_tile_type].img_prev,
+                self._tile_rect(col, row),
+            )
 
-    # Function to draw/update the current board
+    # Function to draw/update the cached surface of the board view
     def _update_board(self):
-        for col in range(Window.NR_OF_TILES):
-            for row in range(Window.NR_OF_TILES):
-                tile = (
-                    col * Window.TILE_SIZE + Window.BOARD_LOCATION[0],
-                    row * Window.TILE_SIZE + Window.BOARD_LOCATION[1],
-                )
-                type = self.gs.board[col][row]
-                self.gs.screen.blit(TILES[type].img, tile)
+        """Redraw changed cells in view on the board surface and return them."""
+        view_tiles = self.view_tiles
+        if self._drawn_view != (self.view, self.tile_size):
+            self.board_surface = pygame.Surface((Window.BOARD_SIZE, Window.BOARD_SIZE))
+            self._drawn_board = [
+                [None for _ in range(view_tiles)] for _ in range(view_tiles)
+            ]
+            self._drawn_view = (self.view, self.tile_size)
+        changed = []
+        first_col, first_row = self.view
+        for x in range(view_tiles):
+            column = self.gs.board[first_col + x]
+            for y in range(view_tiles):
+                type = column[first_row + y]
+                if self._drawn_board[x][y] != type:
+                    tile = (x * self.tile_size, y * self.tile_size)
+                    self.board_surface.blit(self.tiles[type].img, tile)
+                    self._drawn_board[x][y] = type
+                    changed.append((first_col + x, first_row + y))
+        return changed
+
+    def invalidate(self, rect=None):
+        """Mark a screen area, by default the whole screen, for the next update."""
+        if rect is None:
+            self._full_redraw = True
+        else:
+            self._dirty_rects.append(pygame.Rect(rect))
 
     def update_board_screen(self):
-        self._update_board()
-        self._draw_preview()
+        """Redraw changed board cells, the preview and labels, update their rects.
+
+        The view scrolls along with the hovered shape. After scrolling or
+        zooming the whole board view is redrawn.
+        """
+        self._scroll_to_hover()
+        redraw_view = self._drawn_view != (self.view, self.tile_size)
+        preview_cells = self._preview_cells()
+        dirty_cells = set(self._update_board())
+        dirty_cells.update(self._drawn_preview, preview_cells)
+
+        if self._full_redraw or redraw_view:
+            self.gs.screen.blit(self.board_surface, Window.BOARD_LOCATION)
+            rects = [pygame.Rect(Window.BOARD_LOCATION, (Window.BOARD_SIZE,) * 2)]
+        else:
+            rects = []
+            for col, row in dirty_cells:
+                rect = self._tile_rect(col, row)
+                area = rect.move(-Window.BOARD_LOCATION[0], -Window.BOARD_LOCATION[1])
+                self.gs.screen.blit(self.board_surface, rect, area)
+                rects.append(rect)
+        self._draw_preview(preview_cells)
+        self._drawn_preview = preview_cells
+
         self.show_remaining_time()
         self.show_coins()
-        pygame.display.flip()
+        self.show_score_preview()
+
+        if self._full_redraw:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects + self._dirty_rects)
+        self._full_redraw = False
+        self._dirty_rects = []
 
 
 class KeyManager:
@@ -302,6 +406,10 @@ class KeyManager:
             pygame.K_f: self._handle_key_f,
             pygame.K_e: self._handle_key_e,
             pygame.K_t: self._handle_key_t,
+            pygame.K_h: self._handle_key_h,
+            pygame.K_PLUS: self._handle_key_plus,
+            pygame.K_EQUALS: self._handle_key_plus,
+            pygame.K_MINUS: self._handle_key_minus,
             pygame.K_w: self.handle_key_w,
             pygame.K_a: self.handle_key_a,
             pygame.K_s: self.handle_key_s,
@@ -309,29 +417,37 @@ class KeyManager:
         }
 
     def _handle_key_q(self):
-        self.gs.selected_shape = self.dm.rotate_shape(False)
+        self.gs.set_orientation(self.dm.rotate_shape(False))
 
     def _handle_key_r(self):
-        self.gs.selected_shape = self.dm.rotate_shape()
+        self.gs.set_orientation(self.dm.rotate_shape())
 
     def _handle_key_f(self):
-        self.gs.selected_shape = self.dm.flip_shape()
+        self.gs.set_orientation(self.dm.flip_shape())
 
     def _handle_key_e(self):
         if not self.dm.tiles_overlap():
             self.dm.place_tiles()
-            self.gs.timecost += self.gs.explore_card.timecost
-            self.gs.coins += self.gs.explore_card.coins[
-                self.gs.explore_card_shape_pointer
-            ]
-            self.gs._check_mountain_coins()
-            if self.gs.coins > 14:
-                self.gs.coins = 14
             self.gs.drawn = True
 
     def _handle_key_t(self):
         self.dm.explore_card_switch()
 
+    def _handle_key_h(self):
+        """Move the hovered shape to the placement the hint bot suggests."""
+        action = self.gs.hint_bot.choose(self.gs.engine)
+        if action is not None:
+            self.gs.show_action(action)
+        self.dm.show_hint_stats(
+            self.gs.hint_bot.nodes, self.gs.hint_bot.nodes_per_second
+        )
+
+    def _handle_key_plus(self):
+        self.dm.zoom(1)
+
+    def _handle_key_minus(self):
+        self.dm.zoom(-1)
+
     def handle_key_w(self):
         self.gs.hover_pos = self.dm.move_shape((0, -1))
 
@@ -345,22 +461,98 @@ class KeyManager:
         self.gs.hover_pos = self.dm.move_shape((1, 0))
 
 
-class GameState:
+class FrameStats:
+    """Busy and idle time of the frames of the main loop."""
+
     def __init__(self):
+        self.frames = 0
+        self.busy = 0.0
+        self.idle = 0.0
+
+    def add(self, frame_time, idle_time):
+        self.frames += 1
+        self.busy += frame_time - idle_time
+        self.idle += idle_time
+
+    @property
+    def frame_time_ms(self):
+        return self.busy / self.frames * 1000 if self.frames else 0.0
+
+    @property
+    def idle_percent(self):
+        total = self.busy + self.idle
+        return self.idle / total * 100 if total else 100.0
+
+    def __str__(self):
+        return (
+            f"{self.frames} frames, {self.frame_time_ms:.2f} ms busy per frame, "
+            f"{self.idle_percent:.1f}% idle"
+        )
+
+
+class GameState:
+    """Pygame frontend state on top of a headless GameEngine."""
+
+    def __init__(self, engine=None):
+        self.engine = engine if engine is not None else GameEngine()
+        self.hint_bot = Bot("beam", time_budget_ms=300)
         self.draw_manager = DrawManager(self)
         self.key_manager = KeyManager(self)
-        self.board = init_normal_board()
         self.screen = init_screen()
-        self.hover_pos = (Window.NR_OF_TILES // 2, Window.NR_OF_TILES // 2)
+        self.hover_pos = (self.size // 2, self.size // 2)
         self.selected_shape = None
         self.selected_tile_type = None
-        self.mountain_coins = MOUNTAINS.copy()
-        self.coins = 0
+        self.orientation = 0
         self.edicts = None
         self.season = None
-        self.timecost = 0
         self.running = True
         self.drawn = False
+        self.clock = pygame.time.Clock()
+        self.frame_stats = FrameStats()
+        self._frame_start = time.perf_counter()
+        if PROFILER.enabled:
+            self._instrument()
+
+    def _instrument(self):
+        """Time key handlers, draw phases and scoring of this game."""
+        key_handler = self.key_manager.key_handler
+        for key, handler in key_handler.items():
+            key_handler[key] = PROFILER.wrap(
+                f"KeyManager.{handler.__name__}", handler, "handler"
+            )
+        PROFILER.instrument(
+            self.draw_manager,
+            "update_board_screen",
+            "_update_board",
+            "show_remaining_time",
+            "show_coins",
+            "show_score_preview",
+            category="draw",
+        )
+        # the scorer is not shared with engine copies made by the hint bot
+        PROFILER.instrument(self.engine.scorer, "delta", "place", category="scoring")
+        # lazy trackers rescore the board when the scores are read, a copy of
+        # the card keeps other games using it untimed
+        for tracker in self.engine.scorer.trackers.values():
+            if isinstance(tracker, RescoreTracker):
+                tracker.scoring_card = copy.copy(tracker.scoring_card)
+                PROFILER.instrument(tracker.scoring_card, "score", category="scoring")
+
+    @property
+    def board(self):
+        return self.engine.board
+
+    @property
+    def size(self):
+        return self.engine.size
+
+    @property
+    def coins(self):
+        return self.engine.coins
+
+    @property
+    def timecost(self):
+        return self.engine.timecost
 
     def _update_edicts(self, active_edicts):
         # (x, y, width, height)
@@ -379,6 +571,7 @@ class GameState:
                 Window.SPACING,
             )
             self.screen.blit(image, position)
+        self.draw_manager.invalidate(rect)
 
     def set_season(self, season):
         self.season = season
@@ -388,38 +581,72 @@ class GameState:
     def set_edicts(self, edicts):
         self.edicts = edicts
 
-    def _new_shape(self, selected_shape, selected_tile_type):
-        self.hover_pos = (Window.NR_OF_TILES // 2, Window.NR_OF_TILES // 2)
-        self.selected_shape = selected_shape
+    def _new_shape(self, selected_tile_type):
+        self.hover_pos = (self.size // 2, self.size // 2)
+        self.set_orientation(0)
         self.selected_tile_type = selected_tile_type
 
+    def set_orientation(self, orientation):
+        shape = self.explore_card.shapes[self.explore_card_shape_pointer]
+        self.orientation = orientation
+        self.selected_shape = orientation_table(shape)[orientation]
+
     def update_explore_card(self, explore_card):
 
         self.explore_card = explore_card
         self.explore_card_type_pointer = 0
         self.explore_card_shape_pointer = 0
-        self._new_shape(explore_card.shapes[0], TILES_DICT[explore_card.types[0]].val)
+        self._new_shape(TILES_DICT[explore_card.types[0]].val)
         self.screen.blit(explore_card.img, Window.EXPLORE_CARD_LOCATION)
+        self.draw_manager.invalidate((*Window.EXPLORE_CARD_LOCATION, *Window.CARD_SIZE))
 
         self.draw_manager.show_remaining_time()
         self.draw_manager.show_coins()
 
-    def _check_mountain_coins(self):
-        for mountain in self.mountain_coins:
-            mountain_circled = True
-            for pos in [(1, 0), (0, 1), (-1, 0), (0, -1)]:
-                if self.board[pos[0] + mountain[0]][pos[1] + mountain[1]] == 0:
-                    mountain_circled = False
-            if mountain_circled:
-                self.coins += 1
-                self.mountain_coins.remove(mountain)
+    def show_action(self, action):
+        """Select the shape, terrain and orientation of action and hover it."""
+        self.explore_card_shape_pointer = action.shape_index
+        self.explore_card_type_pointer = action.type_index
+        self.selected_tile_type = TILES_DICT[
+            self.explore_card.types[action.type_index]
+        ].val
+        self.set_orientation(action.orientation)
+        self.hover_pos = action.pos
+
+    def current_action(self):
+        """Translate the hovered shape into an engine Action."""
+        return Action(
+            self.hover_pos,
+            self.explore_card_shape_pointer,
+            self.explore_card_type_pointer,
+            self.orientation,
+        )
 
     def draw_board(self):
+        """Block until input arrives, handle it and redraw at most FPS times/s."""
         self.running, self.drawn = True, False
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.running = False
-            elif event.type == pygame.KEYDOWN:
-                if event.key in self.key_manager.key_handler:
-                    self.key_manager.key_handler[event.key]()
-                    self.draw_manager.update_board_screen()
+        idle_start = time.perf_counter()
+        event = pygame.event.wait(Window.EVENT_TIMEOUT)
+        idle = time.perf_counter() - idle_start
+
+        events = pygame.event.get()
+        if event.type != pygame.NOEVENT:
+            events.insert(0, event)
+        handled = False
+        with PROFILER.section("frame", "frame"):
+            for event in events:
+                if event.type == pygame.QUIT:
+                    self.running = False
+                elif event.type == pygame.KEYDOWN:
+                    if event.key in self.key_manager.key_handler:
+                        self.key_manager.key_handler[event.key]()
+                        handled = True
+            if handled:
+                self.draw_manager.update_board_screen()
+
+        idle_start = time.perf_counter()
+        self.clock.tick(Window.FPS)
+        frame_end = time.perf_counter()
+        idle += frame_end - idle_start
+        self.frame_stats.add(frame_end - self._frame_start, idle)
+        self._frame_start = frame_end
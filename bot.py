@@ -0,0 +1,261 @@
+"""Computer player that picks a placement for the current explore card.
+
+greedy ranks every legal placement by how much it raises the projected score,
+beam keeps the best few lines of play over the next cards and mcts runs UCT
+over sampled deck orders. Positions are valued with the active edicts from
+cards.SCORING_CARDS plus coins. Every mode honours a hard per-move time budget
+and returns the best move found so far once it runs out.
+"""
+
+import math
+import random
+import time
+
+from bitboard import bit, popcount
+from engine import MAX_COINS, MONSTER, SEASONS, circled_mountains, monster_penalty
+from tiles import TILES_DICT
+
+MODES = ["greedy", "beam", "mcts"]
+
+
+def _weights(engine):
+    """How often every edict and the coins still get scored this game."""
+    weights = {key: 0 for key in engine.edicts}
+    seasons = SEASONS[engine.season_index :]
+    for season in seasons:
+        for key in season.edicts:
+            weights[key] += 1
+    return weights, len(seasons)
+
+
+def evaluate(engine):
+    """Banked score plus the remaining seasons scored on the current board."""
+    if engine.done:
+        return engine.score
+    weights, seasons = _weights(engine)
+    scores = engine.scorer.scores
+    return (
+        engine.score
+        + sum(weight * scores[key] for key, weight in weights.items())
+        + seasons * (engine.coins - engine.monster_penalty())
+    )
+
+
+def action_gain(engine, action, weights, seasons):
+    """Change of evaluate() if action was played, without playing it."""
+    explore_card = engine.explore_card
+    cells = action.cells(explore_card)
+    tile_type = TILES_DICT[explore_card.types[action.type_index]].val
+    delta = engine.scorer.delta(cells, tile_type)
+    placed = 0
+    for col, row in cells:
+        placed |= bit(col, row, engine.size)
+    occupied = engine.occupied | placed
+    monsters = engine.monsters | placed if tile_type == MONSTER else engine.monsters
+    coins = engine.coins + explore_card.coins[action.shape_index]
+    circled = circled_mountains(occupied, engine.mountain_coins, engine.size)
+    coins = min(MAX_COINS, coins + popcount(circled)) - engine.coins
+    penalty = monster_penalty(occupied, monsters, engine.size)
+    penalty -= engine.monster_penalty()
+    return sum(weights[key] * value for key, value in delta.items()) + seasons * (
+        coins - penalty
+    )
+
+
+def _action_key(engine, action):
+    return (
+        engine.explore_card.name,
+        action.pos,
+        action.shape_index,
+        action.type_index,
+        action.orientation,
+    )
+
+
+class _Node:
+    __slots__ = ("visits", "value", "children")
+
+    def __init__(self):
+        self.visits = 0
+        self.value = 0.0
+        self.children = {}
+
+
+class Bot:
+    """Placement bot usable as a policy: `choose(engine)` returns an Action.
+
+    After every move nodes holds the number of positions evaluated and
+    nodes_per_second the search speed.
+    """
+
+    def __init__(
+        self,
+        mode="greedy",
+        time_budget_ms=100,
+        beam_width=6,
+        branching=8,
+        exploration=1.4,
+        seed=None,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"unknown mode {mode!r}, choose from {MODES}")
+        self.mode = mode
+        self.time_budget_ms = time_budget_ms
+        self.beam_width = beam_width
+        self.branching = branching
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.nodes = 0
+        self.elapsed = 0.0
+        self._deadline = 0.0
+
+    @property
+    def nodes_per_second(self):
+        return self.nodes / self.elapsed if self.elapsed else 0.0
+
+    def choose(self, engine):
+        start = time.perf_counter()
+        self._deadline = start + self.time_budget_ms / 1000
+        self.nodes = 0
+
+        ranked = self._rank(engine)
+        if not ranked:
+            action = None
+        elif self.mode == "greedy" or len(ranked) == 1:
+            action = ranked[0]
+        elif self.mode == "beam":
+            action = self._beam(engine, ranked)
+        else:
+            action = self._mcts(engine, ranked)
+
+        self.elapsed = time.perf_counter() - start
+        return action
+
+    def _out_of_time(self):
+        return time.perf_counter() >= self._deadline
+
+    def _rank(self, engine):
+        """Legal actions sorted by immediate gain, best first."""
+        if engine.done:
+            return []
+        weights, seasons = _weights(engine)
+        scored = []
+        for action in engine.legal_actions():
+            gain = action_gain(engine, action, weights, seasons)
+            scored.append((gain, self.rng.random(), action))
+            self.nodes += 1
+            if self._out_of_time():
+                break
+        scored.sort(key=lambda item: item[:2], reverse=True)
+        return [action for _, _, action in scored]
+
+    def _determinize(self, engine):
+        """Copy of the game with the unknown rest of the deck reshuffled.
+
+        Fixed deck orders of later seasons are dropped as well, the copy
+        shuffles a deck of its own at the start of every season.
+        """
+        state = engine.copy()
+        self.rng.shuffle(state.explore_cards)
+        state.decks = None
+        state.rng.seed(self.rng.random())
+        return state
+
+    def _children(self, state):
+        ranked = self._rank(state)[: self.branching] or [None]
+        for action in ranked:
+            child = state.copy()
+            child.step(action)
+            self.nodes += 1
+            yield child
+
+    def _beam(self, engine, ranked):
+        root = self._determinize(engine)
+        beam = []
+        for action in ranked[: self.branching]:
+            child = root.copy()
+            child.step(action)
+            self.nodes += 1
+            beam.append((evaluate(child), self.rng.random(), action, child))
+            if self._out_of_time():
+                break
+        beam = sorted(beam, key=lambda item: item[:2], reverse=True)
+
+        while not self._out_of_time() and not all(item[3].done for item in beam):
+            layer = []
+            for value, tiebreak, first, state in beam[: self.beam_width]:
+                if state.done:
+                    layer.append((value, tiebreak, first, state))
+                    continue
+                for child in self._children(state):
+                    layer.append((evaluate(child), self.rng.random(), first, child))
+            if self._out_of_time():
+                # only complete layers compare positions at the same depth
+                break
+            beam = sorted(layer, key=lambda item: item[:2], reverse=True)
+        return beam[0][2]
+
+    def _mcts(self, engine, ranked):
+        root = _Node()
+        root_actions = ranked[: self.branching]
+        low, high = math.inf, -math.inf
+
+        while not self._out_of_time():
+            state = self._determinize(engine)
+            node, path, actions = root, [root], root_actions
+            while not state.done:
+                keys = [_action_key(state, action) for action in actions]
+                untried = [
+                    (key, action)
+                    for key, action in zip(keys, actions)
+                    if key not in node.children
+                ]
+                if untried:
+                    key, action = untried[0]
+                    node.children[key] = _Node()
+                else:
+                    spread = max(high - low, 1.0)
+                    log_visits = math.log(node.visits)
+
+                    def ucb(item):
+                        child = node.children[item[0]]
+                        return child.value / child.visits + (
+                            self.exploration
+                            * spread
+                            * math.sqrt(log_visits / child.visits)
+                        )
+
+                    key, action = max(zip(keys, actions), key=ucb)
+                node = node.children[key]
+                state.step(action)
+                self.nodes += 1
+                path.append(node)
+                if untried or state.done:
+                    break
+                actions = self._rank(state)[: self.branching] or [None]
+                if actions == [None]:
+                    state.step(None)
+                    break
+
+            value = self._rollout(state)
+            low, high = min(low, value), max(high, value)
+            for visited in path:
+                visited.visits += 1
+                visited.value += value
+
+        def visits(action):
+            child = root.children.get(_action_key(engine, action))
+            return child.visits if child else 0
+
+        return max(root_actions, key=visits)
+
+    def _rollout(self, state):
+        """Play random cards to the end of the season, then evaluate."""
+        season_index = state.season_index
+        while not state.done and state.season_index == season_index:
+            if self._out_of_time():
+                break
+            actions = list(state.legal_actions())
+            state.step(self.rng.choice(actions) if actions else None)
+            self.nodes += 1
+        return evaluate(state)
@@ -1,4 +1,21 @@
+import bitboard
+import incremental
+import rules
+import score_cache
 import scoring_algorithms
+from rules import (
+    FILLED,
+    OUTSIDE,
+    Adjacent,
+    ClusterCells,
+    Clusters,
+    Count,
+    LargestSquare,
+    Lines,
+    Linked,
+    Surrounded,
+    Terrain,
+)
 
 
 class ExploreCard:
@@ -88,14 +105,65 @@ EXPLORE_CARDS = [
 
 
 class ScoringCard:
-    def __init__(self, image_path, name, scoring_algorithm):
+    def __init__(
+        self,
+        image_path,
+        name,
+        scoring_algorithm,
+        bitboard_algorithm=None,
+        batch_algorithm=None,
+        incremental_algorithm=None,
+    ):
         self.image_path = image_path
         self.name = name
         self.scoring_algorithm = scoring_algorithm
+        self.bitboard_algorithm = bitboard_algorithm
+        self.batch_algorithm = batch_algorithm
+        self.incremental_algorithm = incremental_algorithm
+        self.cache = None
+
+    @classmethod
+    def from_rule(cls, image_path, name, rule):
+        """Card scored by a rules.py rule through its compiled batch kernel."""
+        batch_algorithm = rules.compile_rule(rule)
+        return cls(
+            image_path,
+            name,
+            rules.single_board(batch_algorithm),
+            batch_algorithm=batch_algorithm,
+        )
+
+    def memoize(self, maxsize=score_cache.DEFAULT_SIZE):
+        """Remember the scores of the last maxsize boards, None turns it off."""
+        self.cache = None if maxsize is None else score_cache.ScoreCache(maxsize)
 
     def score(self, board):
+        if self.cache is None:
+            return self._score(board)
+        key = score_cache.board_key(board)
+        score = self.cache.get(key)
+        if score is None:
+            score = self._score(board)
+            self.cache.put(key, score)
+        return score
+
+    def _score(self, board):
+        if isinstance(board, bitboard.BitBoard):
+            if self.bitboard_algorithm is None:
+                return self.scoring_algorithm(board.to_board())
+            return self.bitboard_algorithm(board)
         return self.scoring_algorithm(board)
 
+    def batch_score(self, boards):
+        """Score an (N, rows, cols) array of boards, returns an (N,) array."""
+        return self.batch_algorithm(boards)
+
+
+FOREST = Terrain("forest")
+VILLAGE = Terrain("village")
+FARM = Terrain("farm")
+WATER = Terrain("water")
+MOUNTAIN = Terrain("mountain")
 
 SCORING_CARDS = {
     "forest": [
@@ -103,27 +171,124 @@ SCORING_CARDS = {
             "sentinelwood.jpeg",
             "Sentinel Wood",
             scoring_algorithms.score_sentinelwood,
-        )
+            bitboard.score_sentinelwood,
+            scoring_algorithms.batch_score_sentinelwood,
+            incremental.SentinelWoodTracker,
+        ),
+        # forests surrounded on all four sides by filled cells or the map edge
+        ScoringCard.from_rule(
+            "treetower.jpeg", "Treetower", Count(FOREST & Surrounded(FILLED | OUTSIDE))
+        ),
+        # rows and columns with at least one forest
+        ScoringCard.from_rule(
+            "greenbough.jpeg", "Greenbough", Lines(FOREST, every=False)
+        ),
+        # mountains connected to another mountain by a cluster of forests
+        ScoringCard.from_rule(
+            "stonesideforest.jpeg",
+            "Stoneside Forest",
+            Linked(MOUNTAIN, via=FOREST, points=3),
+        ),
     ],
     "village": [
         ScoringCard(
             "wildholds.jpeg",
             "Wildholds",
             scoring_algorithms.score_wildholds,
-        )
+            bitboard.score_wildholds,
+            scoring_algorithms.batch_score_wildholds,
+            incremental.WildholdsTracker,
+        ),
+        # village clusters bordering three or more different terrains
+        ScoringCard.from_rule(
+            "greengoldplains.jpeg",
+            "Greengold Plains",
+            Clusters(VILLAGE, points=3, min_terrains=3),
+        ),
+        # villages of the largest cluster that does not border a mountain
+        ScoringCard.from_rule(
+            "greatcity.jpeg",
+            "Great City",
+            ClusterCells(VILLAGE, not_touching=MOUNTAIN),
+        ),
+        # villages of the second largest cluster
+        ScoringCard.from_rule(
+            "shieldgate.jpeg", "Shieldgate", ClusterCells(VILLAGE, points=2, rank=2)
+        ),
     ],
     "land+water": [
         ScoringCard(
             "canallake.jpeg",
             "Canal Lake",
             scoring_algorithms.score_canallake,
-        )
+            bitboard.score_canallake,
+            scoring_algorithms.batch_score_canallake,
+            incremental.CanalLakeTracker,
+        ),
+        # waters and farms next to mountains
+        ScoringCard.from_rule(
+            "magesvalley.jpeg",
+            "Mages Valley",
+            Count(WATER & Adjacent(MOUNTAIN), 2) + Count(FARM & Adjacent(MOUNTAIN)),
+        ),
+        # farm clusters away from water and the edge, and the other way round
+        ScoringCard.from_rule(
+            "shoresideexpanse.jpeg",
+            "Shoreside Expanse",
+            Clusters(FARM, points=3, not_touching=WATER | OUTSIDE)
+            + Clusters(WATER, points=3, not_touching=FARM | OUTSIDE),
+        ),
     ],
     "space": [
         ScoringCard(
             "borderlands.jpeg",
             "Borderlands",
             scoring_algorithms.score_borderlands,
-        )
+            bitboard.score_borderlands,
+            scoring_algorithms.batch_score_borderlands,
+            incremental.BorderlandsTracker,
+        ),
+        # complete diagonals from the left to the bottom edge
+        ScoringCard.from_rule(
+            "thebrokenroad.jpeg",
+            "The Broken Road",
+            Lines(FILLED, lines=["diagonals"], points=3),
+        ),
+        # cells along one side of the largest filled square
+        ScoringCard.from_rule(
+            "lostbarony.jpeg", "Lost Barony", LargestSquare(FILLED, points=3)
+        ),
+        # empty cells surrounded by filled cells or the map edge
+        ScoringCard.from_rule(
+            "thecauldrons.jpeg",
+            "The Cauldrons",
+            Count(~FILLED & Surrounded(FILLED | OUTSIDE)),
+        ),
     ],
 }
+
+
+def memoize_scoring_cards(maxsize=score_cache.DEFAULT_SIZE):
+    """Set (or with None drop) a score cache on every card slow to score.
+
+    Cards with bitboard or incremental algorithms score faster than a cache
+    lookup or are not rescored in games, they are left alone.
+    """
+    for stack in SCORING_CARDS.values():
+        for card in stack:
+            if card.bitboard_algorithm is None and card.incremental_algorithm is None:
+                card.memoize(maxsize)
+
+
+def score_cache_stats():
+    """{card name: (hits, misses)} of the memoized scoring cards."""
+    return {
+        card.name: (card.cache.hits, card.cache.misses)
+        for stack in SCORING_CARDS.values()
+        for card in stack
+        if card.cache is not None
+    }
+
+
+if score_cache.CACHE_SIZE:
+    memoize_scoring_cards(score_cache.CACHE_SIZE)
@@ -0,0 +1,113 @@
+"""Memory-mapped board datasets for offline analysis.
+
+A dataset `name` consists of two .npy files:
+
+    name.boards.npy  uint8 (games, turns, rows, cols), the board after every turn
+    name.index.npy   one INDEX_DTYPE record per game
+
+Games shorter than the turns axis repeat their final board, so
+`boards[:, -1]` always holds the final boards. Both files open as numpy.memmap,
+which lets the batched scoring algorithms run over slices without loading the
+whole file into memory:
+
+    dataset = BoardDataset("runs/random")
+    scores = batch_score(dataset.boards[:, -1], SCORING_CARDS["space"][0])
+"""
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from cards import EXPLORE_CARDS
+from engine import EDICTS, SEASONS, GameEngine
+from movelog import decode_edict, encode_edict
+from tiles import NR_OF_TILES
+
+# at most every explore card is drawn in every season
+MAX_TURNS = len(EXPLORE_CARDS) * len(SEASONS)
+
+INDEX_DTYPE = np.dtype(
+    [
+        ("seed", "<i8"),  # -1 for unseeded games
+        ("edicts", "u1", (len(EDICTS),)),  # movelog.encode_edict of A-D
+        ("turns", "<u2"),
+        ("season_scores", "<i2", (len(SEASONS), 4)),
+        ("score", "<i2"),
+    ]
+)
+
+
+class BoardDataset:
+    def __init__(self, path, mode="r"):
+        self.path = path
+        self.boards = np.load(path + ".boards.npy", mmap_mode=mode)
+        self.index = np.load(path + ".index.npy", mmap_mode=mode)
+
+    @classmethod
+    def create(cls, path, games, turns=MAX_TURNS, size=NR_OF_TILES):
+        open_memmap(
+            path + ".boards.npy",
+            mode="w+",
+            dtype=np.uint8,
+            shape=(games, turns, size, size),
+        ).flush()
+        open_memmap(
+            path + ".index.npy", mode="w+", dtype=INDEX_DTYPE, shape=(games,)
+        ).flush()
+        return cls(path, mode="r+")
+
+    def __len__(self):
+        return len(self.index)
+
+    def write(self, game, boards, seed, edicts, season_scores, score):
+        """Store the (turns, rows, cols) boards and results of one game."""
+        turns = len(boards)
+        self.boards[game, :turns] = boards
+        self.boards[game, turns:] = boards[-1]
+        record = self.index[game]
+        record["seed"] = -1 if seed is None else seed
+        record["edicts"] = [encode_edict(edicts[key]) for key in EDICTS]
+        record["turns"] = turns
+        record["season_scores"] = season_scores
+        record["score"] = score
+
+    def write_engine(self, game, boards, engine):
+        self.write(
+            game,
+            boards,
+            engine.seed,
+            engine.edicts,
+            engine.season_scores,
+            engine.score,
+        )
+
+    def edicts(self, game):
+        return {
+            key: decode_edict(code)
+            for key, code in zip(EDICTS, self.index[game]["edicts"])
+        }
+
+    def flush(self):
+        self.boards.flush()
+        self.index.flush()
+
+
+def board_history(game_log):
+    """Per-turn boards of a logged game and the finished engine."""
+    engine = GameEngine(game_log.seed, game_log.edicts, game_log.decks)
+    boards = []
+    for action in game_log.actions:
+        engine.step(action)
+        boards.append(np.array(engine.board, dtype=np.uint8))
+    return np.stack(boards), engine
+
+
+def batch_score(boards, scoring_card, chunk_size=65536):
+    """Score any leading shape of boards chunk by chunk, e.g. a memmap slice."""
+    boards = np.asarray(boards)
+    flat = boards.reshape(-1, *boards.shape[-2:])
+    scores = np.empty(len(flat), dtype=np.int64)
+    for start in range(0, len(flat), chunk_size):
+        scores[start : start + chunk_size] = scoring_card.batch_score(
+            flat[start : start + chunk_size]
+        )
+    return scores.reshape(boards.shape[:-2])
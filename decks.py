@@ -0,0 +1,92 @@
+"""Reproducible deck orders and edict draws for any number of games.
+
+Every game of a DeckEngine gets its own random stream, a function of the
+engine's seed and the game's number only. Dealing games 0..N-1 in one call,
+in batches across processes or game K alone gives bit for bit the same
+cards, and there is no generator to advance past earlier games.
+
+The streams are counter based: a SeedSequence turns the seed into a key and
+the draws of game g are splitmix64 hashes of (key, g, draw index), computed
+for a whole batch of games with a few NumPy ops. Deck orders come out as one
+(games, seasons, cards) permutation array. generator(g) spawns a NumPy
+Generator from the same SeedSequence for anything else a game needs.
+
+    deck_engine = DeckEngine(seed=7)
+    edicts, decks = deck_engine.deal_arrays(np.arange(1_000_000))
+    engine = GameEngine(seed, *deck_engine.deal(12345))
+"""
+
+import numpy as np
+
+from cards import EXPLORE_CARDS, SCORING_CARDS
+from engine import EDICTS, SEASONS
+
+# scoring cards of all categories, edicts are indices into it
+SCORING = [card for stack in SCORING_CARDS.values() for card in stack]
+_STACK_SIZES = np.array([len(stack) for stack in SCORING_CARDS.values()])
+_STACK_STARTS = np.concatenate([[0], np.cumsum(_STACK_SIZES)[:-1]])
+
+_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+# draw indices of a game: category picks, edict order, then the decks
+_PICKS = np.arange(len(SCORING_CARDS), dtype=np.uint64)
+_ORDER = _PICKS + len(SCORING_CARDS)
+_DECKS = np.arange(len(SEASONS) * len(EXPLORE_CARDS), dtype=np.uint64) + (
+    2 * len(SCORING_CARDS)
+)
+
+
+def _mix(x):
+    """splitmix64 output function of uint64 arrays."""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+class DeckEngine:
+    """Per-game random streams of edicts and deck orders from one seed."""
+
+    def __init__(self, seed=None):
+        self.seed_sequence = np.random.SeedSequence(seed)
+        self.key = self.seed_sequence.generate_state(1, np.uint64)[0]
+
+    @property
+    def seed(self):
+        """The seed's entropy, DeckEngine(seed) deals the same games again."""
+        return self.seed_sequence.entropy
+
+    def _draws(self, games, draws):
+        """(len(games), len(draws)) uint64 random values."""
+        games = np.asarray(games, dtype=np.uint64).reshape(-1, 1)
+        with np.errstate(over="ignore"):
+            state = _mix(self.key + games * _GAMMA)
+            return _mix(state + (draws + np.uint64(1)) * _GAMMA)
+
+    def deal_arrays(self, games):
+        """Edicts and deck orders of the numbered games as arrays.
+
+        edicts is (n, 4), indices into SCORING of the cards on edicts A-D.
+        decks is (n, seasons, cards), indices into cards.EXPLORE_CARDS in
+        the order of GameEngine decks, which are drawn from the end.
+        """
+        picks = self._draws(games, _PICKS) % _STACK_SIZES.astype(np.uint64)
+        picks = picks.astype(np.int64) + _STACK_STARTS
+        order = np.argsort(self._draws(games, _ORDER), axis=1)
+        edicts = np.take_along_axis(picks, order, axis=1)
+        keys = self._draws(games, _DECKS).reshape(-1, len(SEASONS), len(EXPLORE_CARDS))
+        return edicts, np.argsort(keys, axis=2)
+
+    def deal(self, game):
+        """Edicts and decks of one game, ready for GameEngine(seed, *deal)."""
+        edicts, decks = self.deal_arrays([game])
+        return (
+            {key: SCORING[index] for key, index in zip(EDICTS, edicts[0])},
+            [[EXPLORE_CARDS[index] for index in deck] for deck in decks[0]],
+        )
+
+    def generator(self, game):
+        """A NumPy Generator of its own for the numbered game."""
+        child = np.random.SeedSequence(
+            self.seed_sequence.entropy,
+            spawn_key=self.seed_sequence.spawn_key + (int(game),),
+        )
+        return np.random.default_rng(child)
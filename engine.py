@@ -0,0 +1,373 @@
+"""Headless rules engine: board, explore deck, seasons, edicts and coins.
+
+Nothing in here imports pygame, so games can be simulated on servers without a
+display. The pygame frontend in board.py drives the same engine through
+`GameEngine.step`.
+"""
+
+import copy
+import random
+
+from adjacency import bit_adjacent, bit_surrounded
+from bitboard import BitBoard, bit, masks, popcount
+from cards import EXPLORE_CARDS, SCORING_CARDS
+from incremental import IncrementalScorer
+from shapes import ORIENTATIONS, orientation_table, placements
+from tiles import NORMAL_MAP, TILES_DICT
+
+MAX_COINS = 14
+EDICTS = ["A", "B", "C", "D"]
+# if a shape can not be placed anywhere a single cell of any of these is drawn
+FALLBACK_TYPES = ["forest", "village", "farm", "water"]
+MONSTER = TILES_DICT["monster"].val
+_EXPLORE_CARDS_BY_NAME = {card.name: card for card in EXPLORE_CARDS}
+
+
+class Season:
+    def __init__(self, name, time, edicts):
+        self.name = name
+        self.time = time
+        self.edicts = edicts
+
+
+SEASONS = [
+    Season("Spring", 8, ["A", "B"]),
+    Season("Summer", 8, ["B", "C"]),
+    Season("Fall", 7, ["C", "D"]),
+    Season("Winter", 6, ["D", "A"]),
+]
+
+
+def draw_edicts(rng=random):
+    """Draw one scoring card per category and assign them to edicts A-D."""
+    scoring_cards = []
+    for _, stack in SCORING_CARDS.items():
+        scoring_cards.append(rng.choice(stack))
+    rng.shuffle(scoring_cards)
+    return {edict: scoring_card for edict, scoring_card in zip(EDICTS, scoring_cards)}
+
+
+def shuffle_explore_cards(rng=random):
+    explore_cards = EXPLORE_CARDS.copy()
+    rng.shuffle(explore_cards)
+    return explore_cards
+
+
+def deal_game(seed):
+    """Edicts and per-season deck orders of GameEngine(seed), drawn up front."""
+    rng = random.Random(seed)
+    edicts = draw_edicts(rng)
+    decks = [shuffle_explore_cards(rng) for _ in SEASONS]
+    return edicts, decks
+
+
+class Action:
+    """Placement of the current explore card.
+
+    pos is the (col, row) the shape offsets are relative to, shape_index and
+    type_index select the shape and terrain printed on the card.
+    """
+
+    def __init__(self, pos, shape_index=0, type_index=0, orientation=0):
+        self.pos = pos
+        self.shape_index = shape_index
+        self.type_index = type_index
+        self.orientation = orientation
+
+    def cells(self, explore_card):
+        shape = orientation_table(explore_card.shapes[self.shape_index])[
+            self.orientation
+        ]
+        return [
+            (self.pos[0] + rel_pos[0], self.pos[1] + rel_pos[1]) for rel_pos in shape
+        ]
+
+    def __repr__(self):
+        return (
+            f"Action(pos={self.pos}, shape_index={self.shape_index}, "
+            f"type_index={self.type_index}, orientation={self.orientation})"
+        )
+
+
+def fallback_card(explore_card):
+    """The 1x1 replacement for an explore card that can not be placed."""
+    fallback = copy.copy(explore_card)
+    fallback.types = FALLBACK_TYPES
+    fallback.shapes = [[(0, 0)]]
+    fallback.coins = [0]
+    return fallback
+
+
+def occupied_mask(board):
+    if isinstance(board, BitBoard):
+        return board.occupied
+    return BitBoard.from_board(board).occupied
+
+
+def _legal_placements(occupied, explore_card, size):
+    free = masks(size).full & ~occupied
+    for shape_index, shape in enumerate(explore_card.shapes):
+        for orientation, pos in placements(free, shape, size):
+            for type_index in range(len(explore_card.types)):
+                yield Action(pos, shape_index, type_index, orientation)
+
+
+def legal_placements(board, explore_card):
+    """Yield every legal Action for the explore card on a list or BitBoard.
+
+    Orientations that give the same cells are only yielded once.
+    """
+    size = board.size if isinstance(board, BitBoard) else len(board)
+    return _legal_placements(occupied_mask(board), explore_card, size)
+
+
+def circled_mountains(occupied, mountains, size):
+    """Bit mask of the mountains whose neighbours on the board are all filled."""
+    return mountains & bit_surrounded(occupied, size)
+
+
+def monster_penalty(occupied, monsters, size):
+    """Empty cells next to a monster, each costs a point at the end of a season."""
+    return popcount(bit_adjacent(monsters, size) & masks(size).full & ~occupied)
+
+
+class GameEngine:
+    """One player's game.
+
+    edicts and decks (the explore cards of every season in the order they are
+    drawn from the end) are drawn from the seeded generator unless given.
+    Deck orders and (explore card, action) pairs are recorded in deck_orders
+    and history. layout sets the board size and mountains, see tiles.MapLayout.
+
+    Every step can be taken back with undo, which restores the placed cells,
+    coins, mountains, time and season in O(shape size), so lookahead can
+    step and undo one game instead of copying it per position.
+    """
+
+    def __init__(self, seed=None, edicts=None, decks=None, layout=NORMAL_MAP):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.decks = decks
+        self.layout = layout
+        self.size = layout.size
+        self.reset(edicts)
+
+    def reset(self, edicts=None):
+        self.board = self.layout.board()
+        self.occupied = occupied_mask(self.board)
+        # bit masks of the mountains that still pay a coin once they are
+        # surrounded and of the monster cells
+        self.mountain_coins = 0
+        for col, row in self.layout.mountains:
+            self.mountain_coins |= bit(col, row, self.size)
+        self.monsters = 0
+        self.coins = 0
+        self.edicts = edicts if edicts is not None else draw_edicts(self.rng)
+        self.scorer = IncrementalScorer(self.board, self.edicts)
+        self.season_index = 0
+        self.season_scores = []
+        self.score = 0
+        self.done = False
+        self.deck_orders = []
+        self.history = []
+        # what every step changed, see undo
+        self.undo_stack = []
+        self._start_season()
+
+    def copy(self):
+        """Independent copy of the game, e.g. for lookahead."""
+        clone = copy.copy(self)
+        clone.rng = random.Random()
+        clone.rng.setstate(self.rng.getstate())
+        clone.board = [column.copy() for column in self.board]
+        clone.explore_cards = self.explore_cards.copy()
+        clone.season_scores = [scores.copy() for scores in self.season_scores]
+        clone.deck_orders = self.deck_orders.copy()
+        clone.history = self.history.copy()
+        clone.scorer = IncrementalScorer(clone.board, clone.edicts)
+        # the new scorer can not take back earlier placements
+        clone.undo_stack = []
+        return clone
+
+    @property
+    def season(self):
+        if self.done:
+            return None
+        return SEASONS[self.season_index]
+
+    def _start_season(self):
+        self.timecost = 0
+        if self.decks is not None:
+            self.explore_cards = list(self.decks[self.season_index])
+        else:
+            self.explore_cards = shuffle_explore_cards(self.rng)
+        self.deck_orders.append(self.explore_cards.copy())
+        self._draw_explore_card()
+
+    def _draw_explore_card(self):
+        explore_card = self.explore_cards.pop()
+        if not self.has_legal_action(explore_card):
+            explore_card = fallback_card(explore_card)
+        self.explore_card = explore_card
+
+    def replace_explore_card(self, name):
+        """Draw the card called name instead, for games dealt elsewhere.
+
+        The card is taken out of the rest of the season's deck and the card
+        drawn goes back into it. deck_orders records the swapped order and
+        undo takes back the step that drew name.
+        """
+        if self.explore_card.name == name:
+            return
+        for index, explore_card in enumerate(self.explore_cards):
+            if explore_card.name == name:
+                break
+        else:
+            raise ValueError(f"{name!r} is not left in the {self.season.name} deck")
+        self.explore_cards[index] = _EXPLORE_CARDS_BY_NAME[self.explore_card.name]
+        # cards are drawn from the end, the rest of the deck is a prefix
+        deck_order = self.deck_orders[-1].copy()
+        drawn = len(self.explore_cards)
+        deck_order[index], deck_order[drawn] = deck_order[drawn], deck_order[index]
+        self.deck_orders[-1] = deck_order
+        if not self.has_legal_action(explore_card):
+            explore_card = fallback_card(explore_card)
+        self.explore_card = explore_card
+        # the step before drew name from the deck, undo has to put it back
+        if self.undo_stack and self.undo_stack[-1][-2] is not None:
+            *undo, _, season_end = self.undo_stack[-1]
+            self.undo_stack[-1] = (*undo, _EXPLORE_CARDS_BY_NAME[name], season_end)
+
+    def legal_actions(self, explore_card=None):
+        explore_card = explore_card or self.explore_card
+        return _legal_placements(self.occupied, explore_card, self.size)
+
+    def has_legal_action(self, explore_card=None):
+        return next(self.legal_actions(explore_card), None) is not None
+
+    def is_legal(self, action):
+        if self.done:
+            return False
+        if action is None:
+            # only a completely filled board lets a card pass without drawing
+            return not self.has_legal_action()
+        explore_card = self.explore_card
+        if not (
+            0 <= action.shape_index < len(explore_card.shapes)
+            and 0 <= action.type_index < len(explore_card.types)
+            and 0 <= action.orientation < ORIENTATIONS
+        ):
+            return False
+        for col, row in action.cells(explore_card):
+            if not (0 <= col < self.size and 0 <= row < self.size):
+                return False
+            if self.board[col][row] != 0:
+                return False
+        return True
+
+    def _check_mountain_coins(self):
+        """Pay the coins of the newly circled mountains."""
+        circled = circled_mountains(self.occupied, self.mountain_coins, self.size)
+        if circled:
+            self.coins += popcount(circled)
+            self.mountain_coins &= ~circled
+
+    def monster_penalty(self):
+        return monster_penalty(self.occupied, self.monsters, self.size)
+
+    def score_season(self):
+        """Score the two active edicts of the current season."""
+        scores = self.scorer.scores
+        return [int(scores[key]) for key in self.season.edicts]
+
+    def _end_season(self):
+        edict_scores = self.score_season()
+        penalty = self.monster_penalty()
+        self.season_scores.append(edict_scores + [self.coins, -penalty])
+        self.score += sum(edict_scores) + self.coins - penalty
+        self.season_index += 1
+        if self.season_index == len(SEASONS):
+            self.done = True
+            self.explore_card = None
+        else:
+            self._start_season()
+
+    def step(self, action):
+        """Place the current explore card and advance the game.
+
+        action is None only when nothing fits on the board anymore. Returns
+        True once the last season has been scored.
+        """
+        if not self.is_legal(action):
+            raise ValueError(f"illegal action {action!r}")
+
+        explore_card = self.explore_card
+        self.history.append((explore_card, action))
+        undo = (explore_card, self.coins, self.mountain_coins, self.timecost)
+        cells, tile_type, placed = (), 0, 0
+        if action is not None:
+            tile_type = TILES_DICT[explore_card.types[action.type_index]].val
+            cells = action.cells(explore_card)
+            for col, row in cells:
+                self.board[col][row] = tile_type
+                placed |= bit(col, row, self.size)
+            self.occupied |= placed
+            if tile_type == MONSTER:
+                self.monsters |= placed
+            self.scorer.place(cells, tile_type)
+            self.coins += explore_card.coins[action.shape_index]
+            self._check_mountain_coins()
+            if self.coins > MAX_COINS:
+                self.coins = MAX_COINS
+
+        self.timecost += explore_card.timecost
+        if self.timecost >= self.season.time:
+            # the season's deck, the score and the generator that shuffles the
+            # next deck are all that ending a season overwrites
+            rng_state = self.rng.getstate() if self.decks is None else None
+            season_end = (self.explore_cards, self.score, rng_state)
+            drawn = None
+            self._end_season()
+        else:
+            season_end = None
+            drawn = self.explore_cards[-1]
+            self._draw_explore_card()
+        self.undo_stack.append(undo + (cells, tile_type, placed, drawn, season_end))
+        return self.done
+
+    def undo(self):
+        """Take back the latest step, the opposite of step in O(shape size)."""
+        if not self.undo_stack:
+            raise ValueError("nothing to undo")
+        (
+            explore_card,
+            self.coins,
+            self.mountain_coins,
+            self.timecost,
+            cells,
+            tile_type,
+            placed,
+            drawn,
+            season_end,
+        ) = self.undo_stack.pop()
+        self.history.pop()
+        if season_end is not None:
+            self.explore_cards, self.score, rng_state = season_end
+            if rng_state is not None:
+                self.rng.setstate(rng_state)
+            if self.done:
+                self.done = False
+            else:
+                self.deck_orders.pop()
+            self.season_index -= 1
+            self.season_scores.pop()
+        else:
+            self.explore_cards.append(drawn)
+        self.explore_card = explore_card
+
+        for col, row in cells:
+            self.board[col][row] = 0
+        self.occupied &= ~placed
+        self.monsters &= ~placed
+        if cells:
+            self.scorer.remove(cells, tile_type)
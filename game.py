@@ -1,42 +1,46 @@
-import pygame
-from board import GameState, init_scoring_card_images, init_explore_card_images
-from cards import SCORING_CARDS, EXPLORE_CARDS
-import random
+"""Play Cartographers in a pygame window.
 
+pygame and the board renderer are only imported when a game is started, so
+the helpers in here import as quickly as the headless modules they use.
+"""
 
-class Season:
-    def __init__(self, name, time, edicts):
-        self.name = name
-        self.time = time
-        self.edicts = edicts
+import argparse
+import os
+import time
+import movelog
+from profiling import PROFILER, TRACE_PATH
+from engine import GameEngine
+from tiles import NORMAL_MAP, NR_OF_TILES, MapLayout
 
+LOG_DIR = "game_logs"
 
-SEASONS = [
-    Season("Spring", 8, ["A", "B"]),
-    Season("Summer", 8, ["B", "C"]),
-    Season("Fall", 7, ["C", "D"]),
-    Season("Winter", 6, ["D", "A"]),
-]
 
+def init_scoring_cards(engine):
+    from board import init_scoring_card_images
 
-def init_scoring_cards():
-    scoring_cards = []
-    for _, stack in SCORING_CARDS.items():
-        scoring_cards.append(random.choice(stack))
-    random.shuffle(scoring_cards)
-    edicts = ["A", "B", "C", "D"]
-    edicts = {edict: scoring_card for edict, scoring_card in zip(edicts, scoring_cards)}
-    init_scoring_card_images(edicts)
+    return init_scoring_card_images(engine.edicts)
 
-    return edicts
 
+def init_explore_cards(engine):
+    from board import init_explore_card_images
 
-def init_explore_cards():
-    explore_cards = EXPLORE_CARDS.copy()
-    random.shuffle(explore_cards)
-    init_explore_card_images(explore_cards)
+    return init_explore_card_images(engine.explore_cards + [engine.explore_card])
 
-    return explore_cards
+
+def print_season_score(season, edicts, season_score, score):
+    for key, edict_score in zip(season.edicts, season_score):
+        print("Score {}: {}".format(key + " - " + edicts[key].name, edict_score))
+    print("Coins:", season_score[2])
+    print("Monsters:", season_score[3])
+    print("Total Score:", score)
+
+
+def map_layout(size, mountains):
+    if size == NR_OF_TILES and mountains == "normal":
+        return NORMAL_MAP
+    if mountains == "random":
+        return MapLayout.random(size)
+    return MapLayout.tiled(size)
 
 
 # explore phase
@@ -46,59 +50,81 @@ def init_explore_cards():
 # check phase
 
 
-pygame.init()
-
-gamestate = GameState()
-edicts = init_scoring_cards()
-gamestate.set_edicts(edicts)
-
-score = 0
-# Main loop
-for season in SEASONS:
-    if not gamestate.running:
-        break
-    gamestate.set_season(season)
-    explore_cards = init_explore_cards()
-    print()
-    print("Season:", season.name)
-    print("Time:", season.time)
-    print(
-        "Edicts:",
-        season.edicts[0] + " - " + edicts[season.edicts[0]].name + " | ",
-        season.edicts[1] + " - " + edicts[season.edicts[1]].name,
-    )
-    print()
-
-    # Season rounds
-    gamestate.timecost = 0
-    gamestate.drawn = True  # that if clause can be accessed
-    while gamestate.timecost < season.time and gamestate.running:
-        if gamestate.drawn:
-            explore_card = explore_cards.pop()
-            gamestate.update_explore_card(explore_card)
-            gamestate.draw_manager.update_board_screen()
-        gamestate.draw_board()
-
-    score1 = edicts[season.edicts[0]].score(gamestate.board)
-    score2 = edicts[season.edicts[1]].score(gamestate.board)
-    score += score1 + score2 + gamestate.coins
-    print(
-        "Score {}: {}".format(
-            season.edicts[0] + " - " + edicts[season.edicts[0]].name, score1
-        )
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=NR_OF_TILES, help="cells per side")
+    parser.add_argument(
+        "--mountains",
+        choices=["normal", "random"],
+        default="normal",
+        help="normal repeats the mountains of the 11x11 map on larger maps",
     )
-    print(
-        "Score {}: {}".format(
-            season.edicts[1] + " - " + edicts[season.edicts[1]].name, score2
-        )
-    )
-    print("Coins:", gamestate.coins)
-    print("Total Score:", score)
-
-# Wait until Quit Pygame
-while gamestate.running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
+    args = parser.parse_args(argv)
+
+    import pygame
+    from board import GameState
+
+    pygame.init()
+
+    gamestate = GameState(GameEngine(layout=map_layout(args.size, args.mountains)))
+    engine = gamestate.engine
+    edicts = init_scoring_cards(engine)
+    gamestate.set_edicts(edicts)
+
+    # Main loop
+    season = None
+    while gamestate.running and not engine.done:
+        if engine.season is not season:
+            season, season_index = engine.season, engine.season_index
+            gamestate.set_season(season)
+            init_explore_cards(engine)
+            print()
+            print("Season:", season.name)
+            print("Time:", season.time)
+            print(
+                "Edicts:",
+                season.edicts[0] + " - " + edicts[season.edicts[0]].name + " | ",
+                season.edicts[1] + " - " + edicts[season.edicts[1]].name,
+            )
+            print()
+            gamestate.drawn = True  # that if clause can be accessed
+
+        # Season rounds
+        if not engine.has_legal_action():
+            # nothing fits on the board anymore, the card is passed
+            engine.step(None)
+            gamestate.drawn = True
+        else:
+            if gamestate.drawn:
+                gamestate.update_explore_card(engine.explore_card)
+                gamestate.draw_manager.update_board_screen()
+            gamestate.draw_board()
+
+        if engine.season_index != season_index:
+            print_season_score(
+                season, edicts, engine.season_scores[season_index], engine.score
+            )
+            print("Frames:", gamestate.frame_stats)
+
+    # move logs only record games on the normal map
+    if engine.done and engine.layout is NORMAL_MAP:
+        os.makedirs(LOG_DIR, exist_ok=True)
+        log_path = os.path.join(LOG_DIR, time.strftime("%Y%m%d-%H%M%S") + ".cgl")
+        movelog.write_logs(log_path, [movelog.GameLog.from_engine(engine)])
+        print("Game log:", log_path)
+
+    if PROFILER.enabled:
+        PROFILER.export_trace(TRACE_PATH)
+        print(PROFILER.summary())
+        print("Trace:", TRACE_PATH)
+
+    # Wait until Quit Pygame
+    while gamestate.running:
+        if pygame.event.wait().type == pygame.QUIT:
             gamestate.running = False
 
-pygame.quit()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
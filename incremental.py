@@ -0,0 +1,329 @@
+"""Incremental edict scoring.
+
+Every tracker keeps the running score of one scoring card for a board and is
+told about each placed shape. Only the placed cells and the rows, columns,
+neighbours and clusters they touch are looked at, so updates and previews cost
+O(shape size) instead of rescoring the whole board.
+
+Trackers expect to be notified after the cells have been written to the board
+(`place`) and can evaluate a hypothetical placement without changing anything
+(`delta`). `remove` takes back the latest placement after its cells have been
+cleared again, in O(shape size) as well, so search code can undo moves instead
+of copying games.
+"""
+
+import numpy as np
+
+from scoring_algorithms import canallake_cells, score_sentinelwood
+from tiles import TILES_DICT
+
+NEIGHBOURS = [(1, 0), (0, 1), (-1, 0), (0, -1)]
+
+
+def _neighbours(board, col, row):
+    for dx, dy in NEIGHBOURS:
+        x, y = col + dx, row + dy
+        if 0 <= x < len(board) and 0 <= y < len(board[0]):
+            yield x, y
+
+
+class SentinelWoodTracker:
+    def __init__(self, board):
+        self.board = board
+        self.score = score_sentinelwood(board)
+
+    def _value(self, cell, tile_type):
+        if tile_type != TILES_DICT["forest"].val:
+            return 0
+        col, row = cell
+        on_edge = col in (0, len(self.board) - 1) or row in (0, len(self.board[0]) - 1)
+        return 1 if on_edge else 0
+
+    def delta(self, cells, tile_type):
+        return sum(self._value(cell, tile_type) for cell in cells)
+
+    def place(self, cells, tile_type):
+        self.score += self.delta(cells, tile_type)
+
+    def remove(self, cells, tile_type):
+        self.score -= self.delta(cells, tile_type)
+
+
+class BorderlandsTracker:
+    def __init__(self, board):
+        self.board = board
+        cols, rows = len(board), len(board[0])
+        filled = np.asarray(board) != 0
+        self.filled_cols = np.count_nonzero(filled, axis=1).tolist()
+        self.filled_rows = np.count_nonzero(filled, axis=0).tolist()
+        self.score = 6 * (self.filled_cols.count(rows) + self.filled_rows.count(cols))
+
+    def _new_lines(self, cells):
+        cols, rows = len(self.board), len(self.board[0])
+        new_cols, new_rows = {}, {}
+        for col, row in cells:
+            new_cols[col] = new_cols.get(col, 0) + 1
+            new_rows[row] = new_rows.get(row, 0) + 1
+        full_lines = sum(
+            1 for col, n in new_cols.items() if self.filled_cols[col] + n == rows
+        ) + sum(1 for row, n in new_rows.items() if self.filled_rows[row] + n == cols)
+        return new_cols, new_rows, full_lines
+
+    def delta(self, cells, tile_type):
+        return 6 * self._new_lines(cells)[2]
+
+    def place(self, cells, tile_type):
+        new_cols, new_rows, full_lines = self._new_lines(cells)
+        for col, n in new_cols.items():
+            self.filled_cols[col] += n
+        for row, n in new_rows.items():
+            self.filled_rows[row] += n
+        self.score += 6 * full_lines
+
+    def remove(self, cells, tile_type):
+        cols, rows = len(self.board), len(self.board[0])
+        for col, row in cells:
+            if self.filled_cols[col] == rows:
+                self.score -= 6
+            if self.filled_rows[row] == cols:
+                self.score -= 6
+            self.filled_cols[col] -= 1
+            self.filled_rows[row] -= 1
+
+
+class CanalLakeTracker:
+    PARTNER = {
+        TILES_DICT["water"].val: TILES_DICT["farm"].val,
+        TILES_DICT["farm"].val: TILES_DICT["water"].val,
+    }
+
+    def __init__(self, board):
+        self.board = board
+        self.scoring = set(map(tuple, np.argwhere(canallake_cells(board)).tolist()))
+        self.score = len(self.scoring)
+
+    def _scores(self, col, row, tile_type, placed):
+        partner = self.PARTNER.get(tile_type)
+        if partner is None:
+            return False
+        for x, y in _neighbours(self.board, col, row):
+            if placed.get((x, y), self.board[x][y]) == partner:
+                return True
+        return False
+
+    def _changes(self, cells, placed):
+        affected = set(cells)
+        for col, row in cells:
+            affected.update(_neighbours(self.board, col, row))
+        gained, lost = set(), set()
+        for col, row in affected:
+            tile_type = placed.get((col, row), self.board[col][row])
+            scores = self._scores(col, row, tile_type, placed)
+            if scores and (col, row) not in self.scoring:
+                gained.add((col, row))
+            elif not scores and (col, row) in self.scoring:
+                lost.add((col, row))
+        return gained, lost
+
+    def delta(self, cells, tile_type):
+        gained, lost = self._changes(cells, {cell: tile_type for cell in cells})
+        return len(gained) - len(lost)
+
+    def place(self, cells, tile_type):
+        gained, lost = self._changes(cells, {})
+        self.scoring |= gained
+        self.scoring -= lost
+        self.score = len(self.scoring)
+
+    def remove(self, cells, tile_type):
+        # rechecking the emptied cells and their neighbours restores the set
+        self.place(cells, tile_type)
+
+
+class WildholdsTracker:
+    """8 points for each village cluster of 6 or more, kept in a union-find.
+
+    Unions are logged and paths are not compressed, so the unions of a
+    placement can be taken back in reverse order.
+    """
+
+    def __init__(self, board):
+        self.board = board
+        self.parent = {}
+        self.size = {}
+        self.score = 0
+        # (root, merged root, its size) of every union
+        self.unions = []
+        # (unions before, score before) of every village placement
+        self.placements = []
+        villages = np.argwhere(np.asarray(board) == TILES_DICT["village"].val)
+        for col, row in villages.tolist():
+            self._add((col, row))
+
+    def _root(self, cell):
+        while self.parent[cell] != cell:
+            cell = self.parent[cell]
+        return cell
+
+    def _points(self, size):
+        return 8 if size >= 6 else 0
+
+    def _merge(self, cells):
+        """Roots joined by the new village cells and the size of the result."""
+        new = set(cells)
+        groups = []
+        while new:
+            stack = [new.pop()]
+            size, roots = 0, set()
+            while stack:
+                col, row = stack.pop()
+                size += 1
+                for x, y in _neighbours(self.board, col, row):
+                    if (x, y) in new:
+                        new.remove((x, y))
+                        stack.append((x, y))
+                    elif (x, y) in self.parent:
+                        roots.add(self._root((x, y)))
+            groups.append((roots, size))
+
+        # groups of new cells touching the same existing cluster merge too
+        merged = []
+        for roots, size in groups:
+            for other in [group for group in merged if group[0] & roots]:
+                merged.remove(other)
+                roots, size = roots | other[0], size + other[1]
+            merged.append((roots, size))
+        return merged
+
+    def delta(self, cells, tile_type):
+        if tile_type != TILES_DICT["village"].val:
+            return 0
+        delta = 0
+        for roots, size in self._merge(cells):
+            delta -= sum(self._points(self.size[root]) for root in roots)
+            delta += self._points(size + sum(self.size[root] for root in roots))
+        return delta
+
+    def _add(self, cell):
+        self.parent[cell] = cell
+        self.size[cell] = 1
+        self.score += self._points(1)
+        for neighbour in _neighbours(self.board, *cell):
+            if neighbour in self.parent:
+                self._union(cell, neighbour)
+
+    def _union(self, a, b):
+        a, b = self._root(a), self._root(b)
+        if a == b:
+            return
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.score -= self._points(self.size[a]) + self._points(self.size[b])
+        self.unions.append((a, b, self.size[b]))
+        self.parent[b] = a
+        self.size[a] += self.size.pop(b)
+        self.score += self._points(self.size[a])
+
+    def place(self, cells, tile_type):
+        if tile_type == TILES_DICT["village"].val:
+            self.placements.append((len(self.unions), self.score))
+            for cell in cells:
+                self._add(cell)
+
+    def remove(self, cells, tile_type):
+        if tile_type != TILES_DICT["village"].val:
+            return
+        unions, self.score = self.placements.pop()
+        while len(self.unions) > unions:
+            a, b, size = self.unions.pop()
+            self.parent[b] = b
+            self.size[b] = size
+            self.size[a] -= size
+        for cell in cells:
+            del self.parent[cell]
+            del self.size[cell]
+
+
+class RescoreTracker:
+    """Fallback for scoring cards without an incremental algorithm.
+
+    The board is only rescored when the score is read after a placement, so
+    games that never look at the running score (servers, replays) do not pay
+    a full rescore per turn.
+    """
+
+    def __init__(self, board, scoring_card):
+        self.board = board
+        self.scoring_card = scoring_card
+        self._score = None
+        # scores before every placement, undo brings them back
+        self._scores = []
+        # scores of the placements taken back from the position after as
+        # many placements, lookahead tends to place them again
+        self._removed = []
+
+    @property
+    def score(self):
+        if self._score is None:
+            self._score = self.scoring_card.score(self.board)
+        return self._score
+
+    def delta(self, cells, tile_type):
+        # the lazy score has to be read before the board is changed
+        score = self.score
+        previous = [self.board[col][row] for col, row in cells]
+        for col, row in cells:
+            self.board[col][row] = tile_type
+        delta = self.scoring_card.score(self.board) - score
+        for (col, row), tile in zip(cells, previous):
+            self.board[col][row] = tile
+        return delta
+
+    def place(self, cells, tile_type):
+        level = len(self._scores)
+        self._scores.append(self._score)
+        key = (tuple(cells), tile_type)
+        if level < len(self._removed) and key in self._removed[level]:
+            self._score = self._removed[level][key]
+        else:
+            self._score = None
+        # the placements taken back further down followed another placement
+        del self._removed[level + 1 :]
+
+    def remove(self, cells, tile_type):
+        score, self._score = self._score, self._scores.pop()
+        level = len(self._scores)
+        while len(self._removed) <= level:
+            self._removed.append({})
+        self._removed[level][tuple(cells), tile_type] = score
+
+
+class IncrementalScorer:
+    """Running scores of all edicts of a game for one board."""
+
+    def __init__(self, board, edicts):
+        self.trackers = {}
+        for key, card in edicts.items():
+            if card.incremental_algorithm is None:
+                self.trackers[key] = RescoreTracker(board, card)
+            else:
+                self.trackers[key] = card.incremental_algorithm(board)
+
+    @property
+    def scores(self):
+        return {key: tracker.score for key, tracker in self.trackers.items()}
+
+    def delta(self, cells, tile_type):
+        return {
+            key: tracker.delta(cells, tile_type)
+            for key, tracker in self.trackers.items()
+        }
+
+    def place(self, cells, tile_type):
+        for tracker in self.trackers.values():
+            tracker.place(cells, tile_type)
+
+    def remove(self, cells, tile_type):
+        """Take back the latest place, after its cells were cleared again."""
+        for tracker in self.trackers.values():
+            tracker.remove(cells, tile_type)
@@ -0,0 +1,166 @@
+"""Compact binary game logs and fast-forward replay.
+
+A log holds the seed, the edict assignment, the deck order of every season and
+every placement packed into 3 bytes:
+
+    card index (4 bits) | fallback (1) | shape index (1) | type index (3)
+    | orientation (3) | col + 2 (4) | row + 2 (4) | unused (4)
+
+A turn on which nothing could be drawn is stored as 0xFFFFFF. Replaying a log
+steps a GameEngine through the recorded actions without any rendering.
+Only games on the normal 11x11 map can be logged.
+"""
+
+import struct
+
+from cards import EXPLORE_CARDS, SCORING_CARDS
+from engine import EDICTS, FALLBACK_TYPES, Action, GameEngine, fallback_card
+from tiles import NORMAL_MAP
+
+MAGIC = b"CGL1"
+# magic, has seed, seed; the seed is signed, so logs of seeds below 2**63
+# written as unsigned read the same
+HEADER = struct.Struct("<4sBq")
+SEED_RANGE = range(-(1 << 63), 1 << 63)
+PASS = 0xFFFFFF
+# positions are anchors of shape offsets and may lie up to 2 cells off the board
+POS_OFFSET = 2
+
+_CATEGORIES = list(SCORING_CARDS)
+_CARD_INDEX = {card.name: i for i, card in enumerate(EXPLORE_CARDS)}
+
+
+class GameLog:
+    """Seed, edicts, per-season deck orders and (explore card, action) pairs."""
+
+    def __init__(self, seed, edicts, decks, history):
+        self.seed = seed
+        self.edicts = edicts
+        self.decks = decks
+        self.history = history
+
+    @classmethod
+    def from_engine(cls, engine):
+        if engine.layout is not NORMAL_MAP:
+            raise ValueError("only games on the normal map can be logged")
+        return cls(
+            engine.seed,
+            engine.edicts,
+            [list(deck) for deck in engine.deck_orders],
+            list(engine.history),
+        )
+
+    @property
+    def actions(self):
+        return [action for _, action in self.history]
+
+
+def encode_edict(scoring_card):
+    for category_index, category in enumerate(_CATEGORIES):
+        stack = SCORING_CARDS[category]
+        if scoring_card in stack:
+            return category_index << 4 | stack.index(scoring_card)
+    raise ValueError(f"{scoring_card.name} is not in cards.SCORING_CARDS")
+
+
+def decode_edict(value):
+    return SCORING_CARDS[_CATEGORIES[value >> 4]][value & 0x0F]
+
+
+def _encode_action(action, explore_card):
+    if action is None:
+        return PASS
+    fallback = explore_card.types == FALLBACK_TYPES
+    value = _CARD_INDEX[explore_card.name]
+    value = value << 1 | fallback
+    value = value << 1 | action.shape_index
+    value = value << 3 | action.type_index
+    value = value << 3 | action.orientation
+    value = value << 4 | action.pos[0] + POS_OFFSET
+    value = value << 4 | action.pos[1] + POS_OFFSET
+    return value << 4
+
+
+def _decode_action(value):
+    """Return the explore card the action was played on and the action."""
+    if value == PASS:
+        return None, None
+    value >>= 4
+    row = (value & 0x0F) - POS_OFFSET
+    col = (value >> 4 & 0x0F) - POS_OFFSET
+    orientation = value >> 8 & 0x07
+    type_index = value >> 11 & 0x07
+    shape_index = value >> 14 & 0x01
+    explore_card = EXPLORE_CARDS[value >> 16]
+    if value >> 15 & 0x01:
+        explore_card = fallback_card(explore_card)
+    return explore_card, Action((col, row), shape_index, type_index, orientation)
+
+
+def encode(game_log):
+    seed = game_log.seed
+    if seed is not None and (not isinstance(seed, int) or seed not in SEED_RANGE):
+        raise ValueError(f"only None or 64-bit integer seeds can be logged: {seed!r}")
+    data = bytearray(HEADER.pack(MAGIC, seed is not None, seed or 0))
+    data += bytes(encode_edict(game_log.edicts[key]) for key in EDICTS)
+
+    data.append(len(game_log.decks))
+    for deck in game_log.decks:
+        data.append(len(deck))
+        data += bytes(_CARD_INDEX[card.name] for card in deck)
+
+    data += struct.pack("<H", len(game_log.history))
+    for explore_card, action in game_log.history:
+        data += _encode_action(action, explore_card).to_bytes(3, "big")
+    return bytes(data)
+
+
+def decode(data):
+    magic, has_seed, seed = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a game log")
+    offset = HEADER.size
+    edicts = {key: decode_edict(data[offset + i]) for i, key in enumerate(EDICTS)}
+    offset += len(EDICTS)
+
+    decks = []
+    for _ in range(data[offset]):
+        length = data[offset + 1]
+        deck = data[offset + 2 : offset + 2 + length]
+        decks.append([EXPLORE_CARDS[card_index] for card_index in deck])
+        offset += 1 + length
+    offset += 1
+
+    (nr_of_actions,) = struct.unpack_from("<H", data, offset)
+    offset += 2
+    history = []
+    for i in range(nr_of_actions):
+        start = offset + i * 3
+        history.append(_decode_action(int.from_bytes(data[start : start + 3], "big")))
+    return GameLog(seed if has_seed else None, edicts, decks, history)
+
+
+def replay(game_log, turn=None):
+    """GameEngine after the first turn actions of the log (all by default)."""
+    engine = GameEngine(game_log.seed, game_log.edicts, game_log.decks)
+    for action in game_log.actions[:turn]:
+        engine.step(action)
+    return engine
+
+
+def write_logs(path, game_logs):
+    """Append length-prefixed encoded logs to a file."""
+    with open(path, "ab") as log_file:
+        for game_log in game_logs:
+            data = game_log if isinstance(game_log, bytes) else encode(game_log)
+            log_file.write(struct.pack("<H", len(data)) + data)
+
+
+def read_logs(path):
+    with open(path, "rb") as log_file:
+        data = log_file.read()
+    offset = 0
+    while offset < len(data):
+        (length,) = struct.unpack_from("<H", data, offset)
+        yield decode(data[offset + 2 : offset + 2 + length])
+        offset += 2 + length
@@ -0,0 +1,45 @@
+"""Placement policies for headless games.
+
+A policy is built once per game from the game seed and asked for an Action
+every turn via `choose(engine)`. It returns None only when the engine has no
+legal action left.
+"""
+
+import random
+from functools import partial
+
+from bot import Bot
+
+
+class FirstLegalPolicy:
+    def __init__(self, seed=None):
+        pass
+
+    def choose(self, engine):
+        return next(engine.legal_actions(), None)
+
+
+class RandomPolicy:
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    def choose(self, engine):
+        actions = list(engine.legal_actions())
+        if not actions:
+            return None
+        return self.rng.choice(actions)
+
+
+POLICIES = {
+    "first": FirstLegalPolicy,
+    "random": RandomPolicy,
+    "greedy": partial(Bot, "greedy", 50),
+    "beam": partial(Bot, "beam", 200),
+    "mcts": partial(Bot, "mcts", 200),
+}
+
+
+def make_policy(name, seed=None):
+    if name not in POLICIES:
+        raise ValueError(f"unknown policy {name!r}, choose from {sorted(POLICIES)}")
+    return POLICIES[name](seed=seed)
@@ -0,0 +1,150 @@
+"""Opt-in timing of UI handlers, draw phases and scoring calls.
+
+Set CARTOGRAPHERS_PROFILE to a file name to turn profiling on:
+
+    CARTOGRAPHERS_PROFILE=trace.json python game.py
+
+Every instrumented call is recorded as a Chrome trace event (open the file in
+chrome://tracing or https://ui.perfetto.dev) and its duration is kept in a
+rolling window per name for percentiles. Instrumentation wraps methods of
+single instances when profiling is on and leaves them untouched otherwise, so
+a disabled profiler costs nothing on the hot paths.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+
+# trace file to write on exit, profiling is off if unset
+TRACE_PATH = os.environ.get("CARTOGRAPHERS_PROFILE")
+WINDOW = 1000  # durations per name kept for percentiles
+MAX_EVENTS = 1_000_000  # trace events kept, later ones are only counted
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(durations, p):
+    """Nearest-rank percentile of a non-empty sequence."""
+    ordered = sorted(durations)
+    index = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class _Section:
+    __slots__ = ("profiler", "name", "category", "start")
+
+    def __init__(self, profiler, name, category):
+        self.profiler = profiler
+        self.name = name
+        self.category = category
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(
+            self.name, self.category, self.start, time.perf_counter_ns()
+        )
+
+
+class Profiler:
+    def __init__(self, enabled=False, window=WINDOW, max_events=MAX_EVENTS):
+        self.enabled = enabled
+        self.window = window
+        self.max_events = max_events
+        self.reset()
+
+    def reset(self):
+        self.durations = {}
+        self.calls = {}
+        self.events = []
+        self.dropped = 0
+        self._origin = time.perf_counter_ns()
+
+    def record(self, name, category, start, end):
+        """Add one call that ran from start to end (perf_counter_ns)."""
+        duration = (end - start) / 1000
+        if name not in self.durations:
+            self.durations[name] = deque(maxlen=self.window)
+            self.calls[name] = 0
+        self.durations[name].append(duration)
+        self.calls[name] += 1
+        if len(self.events) < self.max_events:
+            self.events.append(
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": (start - self._origin) / 1000,
+                    "dur": duration,
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                }
+            )
+        else:
+            self.dropped += 1
+
+    def section(self, name, category="section"):
+        """Context manager timing its body, a no-op when disabled."""
+        if not self.enabled:
+            return nullcontext()
+        return _Section(self, name, category)
+
+    def wrap(self, name, func, category="call"):
+        """func timed under name, func itself when disabled."""
+        if not self.enabled:
+            return func
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(name, category, start, time.perf_counter_ns())
+
+        return timed
+
+    def instrument(self, obj, *method_names, category="call"):
+        """Time the named methods of this instance only."""
+        if not self.enabled:
+            return
+        for method_name in method_names:
+            name = f"{type(obj).__name__}.{method_name}"
+            setattr(
+                obj, method_name, self.wrap(name, getattr(obj, method_name), category)
+            )
+
+    def percentiles(self, name, ps=PERCENTILES):
+        """Percentiles in microseconds over the last window calls of name."""
+        durations = self.durations.get(name)
+        if not durations:
+            return {}
+        return {p: percentile(durations, p) for p in ps}
+
+    def summary(self):
+        lines = [
+            f"{'name':40} {'calls':>8} "
+            + " ".join(f"{'p' + str(p) + ' us':>10}" for p in PERCENTILES)
+        ]
+        for name in sorted(self.durations):
+            values = self.percentiles(name)
+            lines.append(
+                f"{name:40} {self.calls[name]:8} "
+                + " ".join(f"{values[p]:10.1f}" for p in PERCENTILES)
+            )
+        if self.dropped:
+            lines.append(f"{self.dropped} events beyond {self.max_events} not traced")
+        return "\n".join(lines)
+
+    def export_trace(self, path):
+        """Write the recorded events in the Chrome trace event format."""
+        with open(path, "w") as trace_file:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, trace_file)
+
+
+PROFILER = Profiler(enabled=bool(TRACE_PATH))
@@ -0,0 +1,352 @@
+"""Declarative scoring rules compiled to batched NumPy kernels.
+
+A rule combines cell predicates with a scorer that turns them into points:
+
+    TREETOWER = Count(Terrain("forest") & Surrounded(FILLED | OUTSIDE))
+
+Predicates are terrains, OUTSIDE (the cells around the map), adjacency and
+their combinations with &, | and ~. Scorers count cells, complete or touched
+rows, columns and diagonals, clusters with conditions, cells of the n-th
+largest cluster, targets linked through a cluster and the largest square.
+Scorers add up with +.
+
+compile_rule turns a rule into a function scoring an (N, cols, rows) array of
+boards to an (N,) array of points. Every predicate is evaluated once per call
+even if the rule uses it several times.
+"""
+
+import numpy as np
+
+from adjacency import DIRECTIONS, adjacent, neighbour_masks, shift, surrounded
+from clusters import batch_label_clusters
+from tiles import TILES_DICT
+
+LINES = ["rows", "cols", "diagonals"]
+
+
+class Predicate:
+    """Cell predicate, evaluates to an (N, cols, rows) bool mask.
+
+    outside is the value of the predicate for the cells around the map.
+    """
+
+    outside = False
+
+    def evaluate(self, boards, memo):
+        if self not in memo:
+            memo[self] = self._evaluate(boards, memo)
+        return memo[self]
+
+    def neighbours(self, boards, memo):
+        """Masks of the cells whose neighbour in each direction satisfies self."""
+        return neighbour_masks(self.evaluate(boards, memo), self.outside)
+
+    def __and__(self, other):
+        return And(self, other)
+
+    def __or__(self, other):
+        return Or(self, other)
+
+    def __invert__(self):
+        return Not(self)
+
+
+class Terrain(Predicate):
+    def __init__(self, *names):
+        self.values = [TILES_DICT[name].val for name in names]
+
+    def _evaluate(self, boards, memo):
+        return np.isin(boards, self.values)
+
+
+class Outside(Predicate):
+    """Only true around the map, e.g. Adjacent(OUTSIDE) are the edge cells."""
+
+    outside = True
+
+    def _evaluate(self, boards, memo):
+        return np.zeros(boards.shape, dtype=bool)
+
+
+class And(Predicate):
+    def __init__(self, *predicates):
+        self.predicates = predicates
+        self.outside = all(predicate.outside for predicate in predicates)
+
+    def _evaluate(self, boards, memo):
+        return np.logical_and.reduce(
+            [predicate.evaluate(boards, memo) for predicate in self.predicates]
+        )
+
+
+class Or(Predicate):
+    def __init__(self, *predicates):
+        self.predicates = predicates
+        self.outside = any(predicate.outside for predicate in predicates)
+
+    def _evaluate(self, boards, memo):
+        return np.logical_or.reduce(
+            [predicate.evaluate(boards, memo) for predicate in self.predicates]
+        )
+
+
+class Not(Predicate):
+    def __init__(self, predicate):
+        self.predicate = predicate
+        self.outside = not predicate.outside
+
+    def _evaluate(self, boards, memo):
+        return ~self.predicate.evaluate(boards, memo)
+
+
+class Adjacent(Predicate):
+    """At least at_least orthogonal neighbours satisfy the predicate."""
+
+    def __init__(self, predicate, at_least=1):
+        self.predicate = predicate
+        self.at_least = at_least
+
+    def _evaluate(self, boards, memo):
+        mask = self.predicate.evaluate(boards, memo)
+        return adjacent(mask, self.at_least, self.predicate.outside)
+
+
+class Surrounded(Predicate):
+    """All four neighbours satisfy the predicate."""
+
+    def __init__(self, predicate):
+        self.predicate = predicate
+
+    def _evaluate(self, boards, memo):
+        mask = self.predicate.evaluate(boards, memo)
+        return surrounded(mask, self.predicate.outside)
+
+
+EMPTY = Terrain("empty")
+FILLED = ~EMPTY
+OUTSIDE = Outside()
+EDGE = Adjacent(OUTSIDE)
+
+
+class _Clusters:
+    """Clusters of a mask with per cluster sizes, indexed by global root."""
+
+    def __init__(self, mask):
+        n, cols, rows = mask.shape
+        self.cells = cols * rows
+        labels, sizes = batch_label_clusters(mask)
+        self.mask = mask
+        self.roots = labels + (np.arange(n) * self.cells).reshape(n, 1, 1)
+        self.sizes = sizes.ravel()
+        # per direction the cluster cells whose neighbour is not in the cluster
+        self.borders = [mask & ~shift(mask, dx, dy, False) for dx, dy in DIRECTIONS]
+
+    def touching(self, neighbours):
+        """Per root whether a cell bordering the cluster is in the neighbour masks."""
+        touched = np.zeros(len(self.sizes), dtype=bool)
+        for border, neighbour in zip(self.borders, neighbours):
+            touched[self.roots[border & neighbour]] = True
+        return touched
+
+    def per_board(self, values):
+        return values.reshape(-1, self.cells)
+
+
+def _clusters(predicate, boards, memo):
+    key = (_Clusters, predicate)
+    if key not in memo:
+        memo[key] = _Clusters(predicate.evaluate(boards, memo))
+    return memo[key]
+
+
+class Scorer:
+    def __init__(self, points=1):
+        self.points = points
+
+    def __add__(self, other):
+        return Sum(self, other)
+
+
+class Sum(Scorer):
+    def __init__(self, *scorers):
+        self.scorers = scorers
+
+    def score(self, boards, memo):
+        return sum(scorer.score(boards, memo) for scorer in self.scorers)
+
+
+class Count(Scorer):
+    """points for every cell satisfying the predicate."""
+
+    def __init__(self, predicate, points=1):
+        super().__init__(points)
+        self.predicate = predicate
+
+    def score(self, boards, memo):
+        mask = self.predicate.evaluate(boards, memo)
+        return np.count_nonzero(mask, axis=(1, 2)) * self.points
+
+
+class Lines(Scorer):
+    """points for every line of which every (or any) cell satisfies the predicate.
+
+    lines are "rows", "cols" and "diagonals", the diagonals running from the
+    left to the bottom edge of the map.
+    """
+
+    def __init__(self, predicate, lines=("rows", "cols"), every=True, points=1):
+        super().__init__(points)
+        for line in lines:
+            if line not in LINES:
+                raise ValueError(f"unknown line {line!r}, choose from {LINES}")
+        self.predicate = predicate
+        self.lines = lines
+        self.every = every
+
+    def score(self, boards, memo):
+        mask = self.predicate.evaluate(boards, memo)
+        reduce = np.all if self.every else np.any
+        count = np.zeros(len(boards), dtype=np.int64)
+        if "rows" in self.lines:
+            count += np.count_nonzero(reduce(mask, axis=1), axis=1)
+        if "cols" in self.lines:
+            count += np.count_nonzero(reduce(mask, axis=2), axis=1)
+        if "diagonals" in self.lines:
+            for offset in range(mask.shape[2]):
+                diagonal = mask.diagonal(offset=offset, axis1=1, axis2=2)
+                count += reduce(diagonal, axis=1)
+        return count * self.points
+
+
+class Clusters(Scorer):
+    """points for every cluster of the predicate meeting all conditions.
+
+    A cluster can be required to have min_size cells, to border cells of
+    touching, not to border cells of not_touching (use OUTSIDE for the map
+    edge) or to border at least min_terrains different terrains.
+    """
+
+    def __init__(
+        self,
+        predicate,
+        points=1,
+        min_size=1,
+        touching=None,
+        not_touching=None,
+        min_terrains=0,
+    ):
+        super().__init__(points)
+        self.predicate = predicate
+        self.min_size = min_size
+        self.touching = touching
+        self.not_touching = not_touching
+        self.min_terrains = min_terrains
+
+    def qualifying(self, boards, memo):
+        """Cluster sizes by global root, 0 for clusters failing a condition."""
+        clusters = _clusters(self.predicate, boards, memo)
+        sizes = np.where(clusters.sizes >= self.min_size, clusters.sizes, 0)
+        if self.touching is not None:
+            sizes[~clusters.touching(self.touching.neighbours(boards, memo))] = 0
+        if self.not_touching is not None:
+            sizes[clusters.touching(self.not_touching.neighbours(boards, memo))] = 0
+        if self.min_terrains:
+            # distinct (root, terrain) pairs, empty cells and the edge are none
+            pairs = []
+            for (dx, dy), border in zip(DIRECTIONS, clusters.borders):
+                terrain = shift(boards, dx, dy, 0)
+                bordering = border & (terrain != 0)
+                pairs.append(
+                    clusters.roots[bordering] * len(TILES_DICT) + terrain[bordering]
+                )
+            roots = np.unique(np.concatenate(pairs)) // len(TILES_DICT)
+            terrains = np.bincount(roots, minlength=len(sizes))
+            sizes[terrains < self.min_terrains] = 0
+        return clusters.per_board(sizes)
+
+    def score(self, boards, memo):
+        qualifying = self.qualifying(boards, memo)
+        return np.count_nonzero(qualifying, axis=1) * self.points
+
+
+class ClusterCells(Clusters):
+    """points for every cell of the rank-th largest qualifying cluster."""
+
+    def __init__(self, predicate, points=1, rank=1, **conditions):
+        super().__init__(predicate, points, **conditions)
+        self.rank = rank
+
+    def score(self, boards, memo):
+        sizes = self.qualifying(boards, memo)
+        ranked = -np.partition(-sizes, self.rank - 1, axis=1)[:, self.rank - 1]
+        return ranked * self.points
+
+
+class Linked(Scorer):
+    """points for every target cell joined to another target by one cluster."""
+
+    def __init__(self, targets, via, points=1):
+        super().__init__(points)
+        self.targets = targets
+        self.via = via
+
+    def score(self, boards, memo):
+        clusters = _clusters(self.via, boards, memo)
+        targets = self.targets.evaluate(boards, memo)
+        roots = np.where(clusters.mask, clusters.roots, -1)
+        cells = np.arange(roots.size).reshape(roots.shape)
+        pairs = []
+        for dx, dy in DIRECTIONS:
+            neighbour_root = shift(roots, dx, dy, -1)
+            linked = targets & (neighbour_root >= 0)
+            pairs.append(np.stack([cells[linked], neighbour_root[linked]], axis=1))
+        pairs = np.unique(np.concatenate(pairs), axis=0)
+        targets_per_root = np.bincount(pairs[:, 1], minlength=clusters.sizes.size)
+        scoring = np.unique(pairs[targets_per_root[pairs[:, 1]] >= 2, 0])
+        return np.bincount(scoring // clusters.cells, minlength=len(boards)) * (
+            self.points
+        )
+
+
+class LargestSquare(Scorer):
+    """points per cell along one side of the largest square of the predicate."""
+
+    def __init__(self, predicate, points=1):
+        super().__init__(points)
+        self.predicate = predicate
+
+    def score(self, boards, memo):
+        # squares of side k + 1 are 2x2 blocks of squares of side k
+        squares = self.predicate.evaluate(boards, memo)
+        side = np.zeros(len(boards), dtype=np.int64)
+        while squares.size:
+            found = squares.any(axis=(1, 2))
+            if not found.any():
+                break
+            side += found
+            squares = (
+                squares[:, :-1, :-1]
+                & squares[:, 1:, :-1]
+                & squares[:, :-1, 1:]
+                & squares[:, 1:, 1:]
+            )
+        return side * self.points
+
+
+def compile_rule(rule):
+    """Batched scoring function of a rule: (N, cols, rows) boards to (N,)."""
+
+    def batch_score(boards):
+        boards = np.asarray(boards)
+        return np.asarray(rule.score(boards, {}), dtype=np.int64)
+
+    return batch_score
+
+
+def single_board(batch_algorithm):
+    """Scoring function for one board out of a batched one."""
+
+    def score(board):
+        return int(batch_algorithm(np.asarray(board)[np.newaxis])[0])
+
+    return score
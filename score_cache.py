@@ -0,0 +1,99 @@
+"""Bounded LRU memo of scoring card results keyed by compact board keys.
+
+A season scores two edicts and every edict is scored in two seasons, and
+search code rescores the same positions over and over. With a cache set on a
+ScoringCard (ScoringCard.memoize or cards.memoize_scoring_cards), scoring a
+board that was scored before is a dictionary lookup.
+
+A cache holds at most maxsize boards and maxbytes bytes of keys, so large
+maps (one byte per cell) keep fewer boards. Set CARTOGRAPHERS_SCORE_CACHE to
+a number of boards per card to turn the cache on for the scoring cards that
+are slow to score at import:
+
+    CARTOGRAPHERS_SCORE_CACHE=65536 python tournament.py --policy beam
+"""
+
+import os
+from collections import OrderedDict
+from itertools import chain
+
+import numpy as np
+
+from bitboard import BitBoard
+
+# boards kept per card when enabled from the environment, 0 turns it off
+CACHE_SIZE = int(os.environ.get("CARTOGRAPHERS_SCORE_CACHE", 0))
+DEFAULT_SIZE = 1 << 16
+DEFAULT_BYTES = 1 << 26
+
+
+def board_key(board):
+    """Hashable key equal for equal boards: one byte per cell or the bit masks.
+
+    Lists and arrays of the same board share a key, BitBoards get their own.
+    """
+    if isinstance(board, BitBoard):
+        return (board.size, *board.terrain)
+    if isinstance(board, np.ndarray):
+        return board.astype(np.uint8, copy=False).tobytes()
+    return bytes(chain.from_iterable(board))
+
+
+def key_bytes(key):
+    """Bytes a board key stands for, one per cell or the bytes of the masks."""
+    if isinstance(key, bytes):
+        return len(key)
+    return sum((mask.bit_length() + 7) // 8 for mask in key[1:])
+
+
+class ScoreCache:
+    """Least recently used scores by board key with hit and miss counters."""
+
+    def __init__(self, maxsize=DEFAULT_SIZE, maxbytes=DEFAULT_BYTES):
+        if maxsize < 1:
+            raise ValueError("a score cache needs room for at least one board")
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.scores = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """The cached score of key or None, a hit marks it recently used."""
+        score = self.scores.get(key)
+        if score is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.scores.move_to_end(key)
+        return score
+
+    def put(self, key, score):
+        if key not in self.scores:
+            self.bytes += key_bytes(key)
+        self.scores[key] = score
+        while self.scores and (
+            len(self.scores) > self.maxsize or self.bytes > self.maxbytes
+        ):
+            self.bytes -= key_bytes(self.scores.popitem(last=False)[0])
+
+    def clear(self):
+        self.scores.clear()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self):
+        return len(self.scores)
+
+    def __repr__(self):
+        return (
+            f"ScoreCache({len(self)}/{self.maxsize} boards, {self.bytes} bytes, "
+            f"{self.hits} hits, {self.misses} misses)"
+        )
@@ -1,15 +1,7 @@
 import numpy as np
-from board import TILES_DICT
-
-
-def _dfs(i, j, cluster, visited):
-    # traverse the board using dfs and return clusters of non visited cells
-    if i < 0 or i >= len(visited) or j < 0 or j >= len(visited[0]) or visited[i][j]:
-        return
-    cluster.append((i, j))
-    visited[i][j] = True
-    for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
-        _dfs(i + dx, j + dy, cluster, visited)
+from adjacency import adjacent_to
+from clusters import batch_count_clusters, cluster_sizes
+from tiles import TILES_DICT
 
 
 def score_borderlands(board):
@@ -21,51 +13,18 @@ def score_borderlands(board):
 
 
 def score_wildholds(board):
+    sizes = cluster_sizes(board, TILES_DICT["village"].val)
+    # 8 points for each cluster of 6 or more villages
+    return np.count_nonzero(sizes >= 6) * 8
 
-    visited = np.array(board) != TILES_DICT["village"].val
-    clusters = []
-
-    for i in range(len(board)):
-        for j in range(len(board[0])):
-            if not visited[i][j]:
-                cluster = []
-                _dfs(i, j, cluster, visited)
-                if cluster:
-                    clusters.append(cluster)
 
-    # 8 points for each cluster of 6 or more villages
-    return sum(8 for cluster in clusters if len(cluster) >= 6)
+def canallake_cells(board):
+    """Mask of the water cells next to farms and farm cells next to water."""
+    return batch_canallake_cells(np.asarray(board)[np.newaxis])[0]
 
 
 def score_canallake(board):
-    def check_neighbours(board, x, y, value):
-        potential_neighbours = [(x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)]
-
-        # Filter out the neighbours that are out of bounds
-        valid_neighbours = [
-            (x, y)
-            for x, y in potential_neighbours
-            if 0 <= x < len(board) and 0 <= y < len(board[0])
-        ]
-        # Check the valid neighbours
-        for x, y in valid_neighbours:
-            if board[x][y] == value:
-                return True
-        return False
-
-    scoring_board = np.zeros((len(board), len(board[0])), dtype=int)
-    for x in range(len(board)):
-        for y in range(len(board[0])):
-            if board[x][y] == TILES_DICT["water"].val and check_neighbours(
-                board, x, y, TILES_DICT["farm"].val
-            ):
-                scoring_board[x][y] = 1
-            elif board[x][y] == TILES_DICT["farm"].val and check_neighbours(
-                board, x, y, TILES_DICT["water"].val
-            ):
-                scoring_board[x][y] = 1
-
-    return sum(sum(scoring_board))
+    return np.count_nonzero(canallake_cells(board))
 
 
 def score_sentinelwood(board):
@@ -88,3 +47,37 @@ def score_sentinelwood(board):
             score += 1
 
     return score
+
+
+# Batched variants: score an (N, rows, cols) uint8 array of boards at once and
+# return an (N,) vector of scores.
+
+
+def batch_score_borderlands(boards):
+    filled = np.asarray(boards) != 0
+    full_lines = np.count_nonzero(filled.all(axis=2), axis=1) + np.count_nonzero(
+        filled.all(axis=1), axis=1
+    )
+    return full_lines * 6
+
+
+def batch_score_wildholds(boards):
+    # 8 points for each cluster of 6 or more villages
+    return batch_count_clusters(boards, TILES_DICT["village"].val, min_size=6) * 8
+
+
+def batch_canallake_cells(boards):
+    water, farm = TILES_DICT["water"].val, TILES_DICT["farm"].val
+    return adjacent_to(boards, water, farm) | adjacent_to(boards, farm, water)
+
+
+def batch_score_canallake(boards):
+    return np.count_nonzero(batch_canallake_cells(boards), axis=(1, 2))
+
+
+def batch_score_sentinelwood(boards):
+    boards = np.asarray(boards)
+    edge = np.ones(boards.shape[1:], dtype=bool)
+    edge[1:-1, 1:-1] = False
+    forest = boards == TILES_DICT["forest"].val
+    return np.count_nonzero(forest & edge, axis=(1, 2))
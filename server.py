@@ -0,0 +1,412 @@
+"""Asyncio game server for simultaneous play, many sessions per process.
+
+All players of a session draw on their own map from the same explore card:
+the session deals one set of edicts and deck orders and keeps one GameEngine
+per player on them. A turn is resolved once every player has sent an action.
+
+Clients speak JSON lines over TCP. Client to server:
+
+    {"type": "join", "session": "s1", "player": "ann", "players": 2}
+    {"type": "play", "action": {"pos": [3, 4], "shape_index": 0,
+                                "type_index": 1, "orientation": 2}}
+
+"players" only matters for the first player of a session, an action of null
+passes when nothing fits on the board anymore. The server picks the seed of
+every session and never sends it, so no player learns the coming cards; a
+server started with client_seeds (serve --client-seeds) takes a "seed" from the
+first player instead, for reproducible leagues. Server to client:
+
+    {"type": "joined", "session": "s1", "edicts": {"A": "Sentinel Wood", ...}}
+    {"type": "turn", "turn": 0, "season": "Spring", "card": "Hamlet"}
+    {"type": "season", "season": "Spring", "scores": {"ann": [...], ...}}
+    {"type": "over", "scores": {"ann": 54, ...}, "aborted": false}
+    {"type": "error", "message": "..."}
+
+The stand-in client keeps a GameEngine on the edicts it was sent, draws the
+card of every turn message into it and plays with one of the headless
+policies. league runs a server and its clients in one process:
+
+    python server.py serve --port 8765
+    python server.py client --session s1 --player ann --players 2 --policy greedy
+    python server.py league --sessions 200 --players 2 --policy first
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from decks import SCORING
+from engine import SEASONS, Action, GameEngine, deal_game
+from policies import POLICIES, make_policy
+from profiling import PERCENTILES, PROFILER, percentile
+
+HOST = "127.0.0.1"
+PORT = 8765
+
+
+_SCORING_BY_NAME = {card.name: card for card in SCORING}
+
+
+def client_engine(edicts, seed=None):
+    """A client's GameEngine on the edict names of a joined message.
+
+    Its own deck order is a guess, replace_explore_card puts in the card of
+    every turn message.
+    """
+    return GameEngine(
+        seed, {key: _SCORING_BY_NAME[name] for key, name in edicts.items()}
+    )
+
+
+def encode_action(action):
+    if action is None:
+        return None
+    return {
+        "pos": list(action.pos),
+        "shape_index": action.shape_index,
+        "type_index": action.type_index,
+        "orientation": action.orientation,
+    }
+
+
+def decode_action(data):
+    """Action of a play message, ValueError unless every field is an integer.
+
+    Whether the indices fit the current explore card is up to
+    GameEngine.is_legal.
+    """
+    if data is None:
+        return None
+    pos = tuple(data["pos"])
+    indices = [data.get(key, 0) for key in ("shape_index", "type_index", "orientation")]
+    values = list(pos) + indices
+    if len(pos) != 2 or not all(
+        isinstance(value, int) and not isinstance(value, bool) for value in values
+    ):
+        raise ValueError(f"malformed action {data!r}")
+    return Action(pos, *indices)
+
+
+def send(writer, message):
+    writer.write(json.dumps(message).encode() + b"\n")
+
+
+class Session:
+    """Shared edicts and decks, one engine and one connection per player."""
+
+    def __init__(self, name, players, seed):
+        self.name = name
+        self.players = players
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.edicts, self.decks = deal_game(self.seed)
+        self.engines = {}
+        self.writers = {}
+        self.actions = {}
+        self.turn = 0
+        self.over = False
+
+    @property
+    def started(self):
+        return len(self.engines) == self.players
+
+    def join(self, player, writer):
+        if self.started:
+            raise ValueError(f"session {self.name} is full")
+        if player in self.engines:
+            raise ValueError(f"player {player} already joined {self.name}")
+        self.engines[player] = GameEngine(self.seed, self.edicts, self.decks)
+        self.writers[player] = writer
+        send(
+            writer,
+            {
+                "type": "joined",
+                "session": self.name,
+                "edicts": {key: card.name for key, card in self.edicts.items()},
+            },
+        )
+        if self.started:
+            self._send_turn()
+
+    def _send_turn(self):
+        for player, engine in self.engines.items():
+            send(
+                self.writers[player],
+                {
+                    "type": "turn",
+                    "turn": self.turn,
+                    "season": engine.season.name,
+                    "card": engine.explore_card.name,
+                },
+            )
+
+    def play(self, player, action):
+        """Record the action of a player, resolve the turn once all are in."""
+        if not self.started:
+            raise ValueError("waiting for players")
+        if player in self.actions:
+            raise ValueError("already played this turn")
+        if not self.engines[player].is_legal(action):
+            raise ValueError(f"illegal action {encode_action(action)}")
+        self.actions[player] = action
+        if len(self.actions) == self.players:
+            with PROFILER.section("Session.resolve_turn", "server"):
+                self._resolve_turn()
+
+    def _resolve_turn(self):
+        season_index = next(iter(self.engines.values())).season_index
+        for player, engine in self.engines.items():
+            engine.step(self.actions[player])
+        self.actions = {}
+        self.turn += 1
+
+        engine = next(iter(self.engines.values()))
+        if engine.season_index != season_index:
+            self._broadcast(
+                {
+                    "type": "season",
+                    "season": SEASONS[season_index].name,
+                    "scores": {
+                        player: engine.season_scores[season_index]
+                        for player, engine in self.engines.items()
+                    },
+                }
+            )
+        if engine.done:
+            self.finish()
+        else:
+            self._send_turn()
+
+    def _broadcast(self, message):
+        for writer in self.writers.values():
+            send(writer, message)
+
+    def finish(self, aborted=False):
+        if self.over:
+            return
+        self.over = True
+        self._broadcast(
+            {
+                "type": "over",
+                "scores": {
+                    player: engine.score for player, engine in self.engines.items()
+                },
+                "aborted": aborted,
+            }
+        )
+
+    def leave(self, player):
+        self.writers.pop(player, None)
+        if not self.over:
+            self.finish(aborted=True)
+
+
+class GameServer:
+    """Hosts sessions by name, every connection is one player of one session.
+
+    Session seeds are picked by the server unless client_seeds is set.
+    """
+
+    def __init__(self, client_seeds=False):
+        self.client_seeds = client_seeds
+        self.sessions = {}
+
+    async def handle(self, reader, writer):
+        session = player = None
+        try:
+            while line := await reader.readline():
+                try:
+                    message = json.loads(line)
+                    if message["type"] == "join" and session is None:
+                        session = self._session(message)
+                        player = str(message["player"])
+                        session.join(player, writer)
+                    elif message["type"] == "play" and session is not None:
+                        session.play(player, decode_action(message["action"]))
+                    else:
+                        raise ValueError(f"unexpected {message['type']!r} message")
+                except (ValueError, KeyError, TypeError, IndexError) as error:
+                    if session is not None and player not in session.engines:
+                        session = None  # the join failed
+                    send(writer, {"type": "error", "message": str(error)})
+                await writer.drain()
+                if session is not None and session.over:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            if session is not None:
+                session.leave(player)
+                if not session.writers:
+                    self.sessions.pop(session.name, None)
+            writer.close()
+
+    def _session(self, message):
+        name = str(message["session"])
+        session = self.sessions.get(name)
+        if session is None or session.over:
+            seed = message.get("seed")
+            if seed is not None and not self.client_seeds:
+                raise ValueError("this server picks the session seeds")
+            session = Session(name, int(message.get("players", 1)), seed)
+            if session.players < 1:
+                raise ValueError("a session needs at least one player")
+            self.sessions[name] = session
+        return session
+
+
+async def serve(host=HOST, port=PORT, client_seeds=False):
+    """Start a GameServer, returns the asyncio server and the GameServer."""
+    game_server = GameServer(client_seeds)
+    server = await asyncio.start_server(game_server.handle, host, port)
+    return server, game_server
+
+
+async def play_client(
+    session,
+    player,
+    players=1,
+    seed=None,
+    policy_name="first",
+    host=HOST,
+    port=PORT,
+    client_seeds=False,
+):
+    """Play one seat of a session with a policy.
+
+    seed seeds the policy and the client's engine, and the session if the
+    server takes client seeds. Returns the final scores of the session and the round trip of every turn
+    in microseconds, from sending the action to receiving the next message.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    join = {"type": "join", "session": session, "player": player, "players": players}
+    if seed is not None and client_seeds:
+        join["seed"] = seed
+    send(writer, join)
+    engine = policy = None
+    latencies = []
+    sent = None
+    try:
+        while line := await reader.readline():
+            if sent is not None:
+                latencies.append((time.perf_counter_ns() - sent) / 1000)
+                sent = None
+            message = json.loads(line)
+            if message["type"] == "joined":
+                engine = client_engine(message["edicts"], seed)
+                policy = make_policy(policy_name, seed)
+            elif message["type"] == "turn":
+                try:
+                    engine.replace_explore_card(message["card"])
+                except ValueError as error:
+                    raise RuntimeError(
+                        f"client out of sync on turn {message['turn']}"
+                    ) from error
+                action = policy.choose(engine)
+                engine.step(action)
+                send(writer, {"type": "play", "action": encode_action(action)})
+                sent = time.perf_counter_ns()
+            elif message["type"] == "over":
+                return message["scores"], latencies
+            elif message["type"] == "error":
+                raise RuntimeError(message["message"])
+            await writer.drain()
+    finally:
+        writer.close()
+    raise ConnectionError("server closed the connection")
+
+
+async def run_league(sessions, players, policy_name, seed=0, host=HOST, port=0):
+    """Play sessions of bot players against one in-process server.
+
+    Session i is seeded seed + i, the clients only see its edicts and cards.
+    """
+    server, _ = await serve(host, port, client_seeds=True)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        clients = [
+            play_client(
+                f"s{i}", f"p{j}", players, seed + i, policy_name, host, port, True
+            )
+            for i in range(sessions)
+            for j in range(players)
+        ]
+        return await asyncio.gather(*clients)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="run a game server")
+    client_parser = commands.add_parser("client", help="play one seat with a bot")
+    league_parser = commands.add_parser(
+        "league", help="run a server with bot sessions in this process"
+    )
+    for command in (serve_parser, client_parser):
+        command.add_argument("--host", default=HOST)
+        command.add_argument("--port", type=int, default=PORT)
+        command.add_argument(
+            "--client-seeds",
+            action="store_true",
+            help="sessions are seeded by their first player (--seed)",
+        )
+    for command in (client_parser, league_parser):
+        command.add_argument("--players", type=int, default=2)
+        command.add_argument("--policy", choices=sorted(POLICIES), default="first")
+        command.add_argument("--seed", type=int, default=0)
+    client_parser.add_argument("--session", default="s0")
+    client_parser.add_argument("--player", default="p0")
+    league_parser.add_argument("--sessions", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+
+        async def serve_forever():
+            server, _ = await serve(args.host, args.port, args.client_seeds)
+            async with server:
+                await server.serve_forever()
+
+        asyncio.run(serve_forever())
+    elif args.command == "client":
+        scores, _ = asyncio.run(
+            play_client(
+                args.session,
+                args.player,
+                args.players,
+                args.seed,
+                args.policy,
+                args.host,
+                args.port,
+                args.client_seeds,
+            )
+        )
+        print(json.dumps(scores))
+    else:
+        start = time.perf_counter()
+        results = asyncio.run(
+            run_league(args.sessions, args.players, args.policy, args.seed)
+        )
+        elapsed = time.perf_counter() - start
+        latencies = [latency for _, seat in results for latency in seat]
+        turns = len(latencies) // args.players
+        print(
+            f"{args.sessions} sessions, {turns} turns in {elapsed:.1f}s "
+            f"({turns / elapsed:.0f} turns/s)"
+        )
+        if latencies:
+            print(
+                "turn round trip "
+                + ", ".join(
+                    f"p{p} {percentile(latencies, p) / 1000:.1f} ms"
+                    for p in PERCENTILES
+                )
+            )
+        scores = [
+            score for scores, _ in results[:: args.players] for score in scores.values()
+        ]
+        print(f"mean score {sum(scores) / len(scores):.1f}")
+
+
+if __name__ == "__main__":
+    main()
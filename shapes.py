@@ -0,0 +1,138 @@
+"""Precomputed orientations and placement masks of explore card shapes.
+
+Orientations 0-3 are 0-3 clockwise rotations of a shape, 4-7 are the same
+rotations applied after flipping the shape horizontally. Tables are built once
+per shape and cached, so rotating, flipping and enumerating placements never
+rebuild offset lists.
+
+placement_masks lists one mask per placement, which suits the 11x11 board.
+placements finds the free placements of any board size with a few shifts of
+the free-cell mask per orientation instead.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from bitboard import from_array, set_bits
+from tiles import NR_OF_TILES
+
+ORIENTATIONS = 8
+
+
+def orient_shape(shape, orientation=0):
+    """Return the shape in one of its ORIENTATIONS orientations."""
+    if orientation >= 4:
+        shape = [(-pos[0], pos[1]) for pos in shape]
+    for _ in range(orientation % 4):
+        shape = [(-pos[1], pos[0]) for pos in shape]
+    return shape
+
+
+def rotate_orientation(orientation, clockwise=True):
+    turns = 1 if clockwise else 3
+    return (orientation + turns) % 4 + orientation // 4 * 4
+
+
+def flip_orientation(orientation):
+    # flipping a rotated shape equals rotating the flipped shape the other way
+    return (-orientation) % 4 + (1 - orientation // 4) * 4
+
+
+@lru_cache(maxsize=None)
+def _orientation_table(shape):
+    return tuple(
+        tuple(orient_shape(shape, orientation)) for orientation in range(ORIENTATIONS)
+    )
+
+
+def orientation_table(shape):
+    """All 8 orientations of the shape as tuples of offsets."""
+    return _orientation_table(tuple(shape))
+
+
+@lru_cache(maxsize=None)
+def _unique_orientations(shape):
+    unique, seen = [], set()
+    for orientation, offsets in enumerate(_orientation_table(shape)):
+        min_x = min(pos[0] for pos in offsets)
+        min_y = min(pos[1] for pos in offsets)
+        normalized = frozenset((pos[0] - min_x, pos[1] - min_y) for pos in offsets)
+        if normalized not in seen:
+            seen.add(normalized)
+            unique.append(orientation)
+    return tuple(unique)
+
+
+def unique_orientations(shape):
+    """Orientation indices that cover distinct shapes up to translation."""
+    return _unique_orientations(tuple(shape))
+
+
+@lru_cache(maxsize=None)
+def _placement_masks(shape, size):
+    placements = []
+    for orientation in _unique_orientations(shape):
+        offsets = _orientation_table(shape)[orientation]
+        min_x = min(pos[0] for pos in offsets)
+        min_y = min(pos[1] for pos in offsets)
+        max_x = max(pos[0] for pos in offsets)
+        max_y = max(pos[1] for pos in offsets)
+        base = 0
+        for x, y in offsets:
+            base |= 1 << ((x - min_x) * size + y - min_y)
+        for col in range(size - (max_x - min_x)):
+            for row in range(size - (max_y - min_y)):
+                pos = (col - min_x, row - min_y)
+                placements.append((orientation, pos, base << (col * size + row)))
+    return tuple(placements)
+
+
+def placement_masks(shape, size=NR_OF_TILES):
+    """(orientation, pos, mask) for every in-bounds placement of the shape.
+
+    Orientations that only differ by translation are listed once. mask uses
+    the bit layout of bitboard.BitBoard.
+    """
+    return _placement_masks(tuple(shape), size)
+
+
+@lru_cache(maxsize=None)
+def _anchored_orientations(shape, size):
+    """Per unique orientation the anchor to pos offset and the cell shifts."""
+    anchored = []
+    for orientation in _unique_orientations(shape):
+        offsets = _orientation_table(shape)[orientation]
+        min_x = min(pos[0] for pos in offsets)
+        min_y = min(pos[1] for pos in offsets)
+        width = max(pos[0] for pos in offsets) - min_x + 1
+        height = max(pos[1] for pos in offsets) - min_y + 1
+        shifts = tuple((x - min_x) * size + y - min_y for x, y in offsets)
+        anchored.append(
+            (orientation, (-min_x, -min_y), shifts, _anchors(width, height, size))
+        )
+    return tuple(anchored)
+
+
+@lru_cache(maxsize=None)
+def _anchors(width, height, size):
+    # top left cells of the width x height boxes that fit on the board
+    anchors = np.zeros((size, size), dtype=bool)
+    anchors[: size - width + 1, : size - height + 1] = True
+    return from_array(anchors)
+
+
+def placements(free, shape, size=NR_OF_TILES):
+    """Yield (orientation, pos) for every placement of the shape on free cells.
+
+    free is a mask in the bit layout of bitboard.BitBoard. Placements come in
+    the order of placement_masks.
+    """
+    for orientation, (dx, dy), shifts, anchors in _anchored_orientations(
+        tuple(shape), size
+    ):
+        for shift in shifts:
+            anchors &= free >> shift
+        for index in set_bits(anchors):
+            col, row = divmod(index, size)
+            yield orientation, (col + dx, row + dy)
@@ -0,0 +1,349 @@
+"""Offline branch-and-bound solver for the best score of a seeded game.
+
+The edicts and every season's deck order follow from the seed (see
+engine.deal_game), and so does the card drawn on every turn, since time
+costs do not depend on the placements. The solver runs a depth-first search
+over all placements of those cards and prunes every position whose upper
+bound can not beat the best game found so far:
+
+    python solver.py --seed 3 --time 60
+
+Upper bounds add up, per season still to be scored, what each active edict
+can gain from the cells the remaining cards can fill, the coins those cards
+and the open mountains can pay and no monster penalty. A card's gain per
+filled cell is bounded by hand in CELL_GAINS, FILLED_BOUNDS caps the scores
+of cards that can gain more from one cell; cards missing there do not prune
+at all.
+
+Positions are Zobrist hashed (board, turn and coins, which is everything the
+rest of the game depends on) into a fixed-size transposition table, so
+placements reached in a different order are searched once. The report lists
+nodes searched, the table hit rate and either the proven optimum or the best
+score found with the best bound left when time ran out.
+"""
+
+import argparse
+import json
+import math
+import random
+import time
+
+from bitboard import popcount
+from bot import evaluate
+from engine import MAX_COINS, SEASONS, GameEngine, deal_game
+from policies import POLICIES, make_policy
+from tiles import NORMAL_MAP, TILES_DICT
+
+TT_SIZE = 1 << 20
+VILLAGE = TILES_DICT["village"].val
+
+# most points one filled cell can add to a card's score
+CELL_GAINS = {
+    "Sentinel Wood": 1,
+    "Treetower": 5,  # the cell and its four neighbours get surrounded
+    "Greenbough": 2,  # its row and its column
+    "Stoneside Forest": 3 * len(NORMAL_MAP.mountains),
+    "Wildholds": 8,  # at most one more cluster of six
+    "Greengold Plains": 12,  # a new terrain for up to four clusters
+    "Canal Lake": 5,
+    "Mages Valley": 2,
+    "Shoreside Expanse": 3,  # at most one more cluster
+    "Borderlands": 12,  # its row and its column
+    "The Broken Road": 3,  # its diagonal
+    "The Cauldrons": 4,  # its four neighbours
+}
+# cards whose score after filling cells is bounded by the filled cell count,
+# one cell can grow the largest square by more than one
+FILLED_BOUNDS = {
+    "Lost Barony": lambda filled, size: 3 * min(size, math.isqrt(filled)),
+}
+# cards scoring at most one point per village on the board
+VILLAGE_BOUNDED = {"Great City", "Shieldgate"}
+
+
+class _Timeout(Exception):
+    pass
+
+
+class TranspositionTable:
+    """Fixed number of slots indexed by hash, deeper subtrees are kept.
+
+    Entries hold the best score still to come from a position, either exact
+    (with the line reaching it) or an upper bound.
+    """
+
+    def __init__(self, size=TT_SIZE):
+        self.size = size
+        self.slots = [None] * size
+        self.probes = 0
+        self.hits = 0
+
+    def get(self, key):
+        self.probes += 1
+        entry = self.slots[key % self.size]
+        if entry is None or entry[0] != key:
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, key, turn, value, exact, line):
+        index = key % self.size
+        entry = self.slots[index]
+        # positions closer to the root stand for more search
+        if entry is None or entry[0] == key or turn <= entry[1]:
+            self.slots[index] = (key, turn, value, exact, line)
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.probes if self.probes else 0.0
+
+
+class Solver:
+    """Branch-and-bound search of the best score of GameEngine(seed).
+
+    seasons limits the search to the score after the first seasons, the
+    actions of opening are played before searching the rest of the game.
+    """
+
+    def __init__(
+        self,
+        seed,
+        seasons=len(SEASONS),
+        tt_size=TT_SIZE,
+        time_limit=None,
+        opening=(),
+    ):
+        self.seed = seed
+        self.seasons = seasons
+        self.time_limit = time_limit
+        self.table = TranspositionTable(tt_size)
+        self.edicts, decks = deal_game(seed)
+        self.root = GameEngine(seed, self.edicts, decks)
+        for action in opening:
+            self.root.step(action)
+        self._schedule(decks)
+
+        rng = random.Random(0)
+        cells = self.root.size * self.root.size
+        self.zobrist = [[rng.getrandbits(64) for _ in TILES_DICT] for _ in range(cells)]
+        self.zobrist_turn = [rng.getrandbits(64) for _ in range(len(self.cells) + 1)]
+        self.zobrist_coins = [rng.getrandbits(64) for _ in range(MAX_COINS + 1)]
+
+        self.root_hash = 0
+        for col, column in enumerate(self.root.board):
+            for row, tile_type in enumerate(column):
+                self.root_hash ^= self.zobrist[col * self.root.size + row][tile_type]
+
+        self.nodes = 0
+        self.best_score = -math.inf
+        self.best_line = None
+        self.elapsed = 0.0
+
+    def _schedule(self, decks):
+        """Per turn prefix sums of fillable cells and coins, turn of season ends."""
+        self.cells, self.coins, self.season_ends = [0], [0], []
+        for season, deck in zip(SEASONS, decks):
+            deck, timecost = list(deck), 0
+            while timecost < season.time:
+                card = deck.pop()
+                timecost += card.timecost
+                self.cells.append(self.cells[-1] + max(map(len, card.shapes)))
+                self.coins.append(self.coins[-1] + max(card.coins))
+            self.season_ends.append(len(self.cells) - 1)
+
+    def _finished(self, engine):
+        return engine.done or engine.season_index >= self.seasons
+
+    def bound(self, engine):
+        """Upper bound of the points still to come in the solved seasons."""
+        turn = len(engine.history)
+        scores = engine.scorer.scores
+        filled = popcount(engine.occupied)
+        empty = engine.size * engine.size - filled
+        villages = sum(column.count(VILLAGE) for column in engine.board)
+        mountains = popcount(engine.mountain_coins)
+        total = 0
+        for season_index in range(engine.season_index, self.seasons):
+            end = self.season_ends[season_index]
+            cells = min(empty, self.cells[end] - self.cells[turn])
+            for key in SEASONS[season_index].edicts:
+                name = self.edicts[key].name
+                if name in VILLAGE_BOUNDED:
+                    total += villages + cells
+                elif name in CELL_GAINS:
+                    total += scores[key] + CELL_GAINS[name] * cells
+                elif name in FILLED_BOUNDS:
+                    total += FILLED_BOUNDS[name](filled + cells, engine.size)
+                else:
+                    return math.inf
+            coins = self.coins[end] - self.coins[turn] + mountains
+            total += min(MAX_COINS, engine.coins + coins)
+        return total
+
+    def _key(self, board_hash, engine):
+        return (
+            board_hash
+            ^ self.zobrist_turn[len(engine.history)]
+            ^ self.zobrist_coins[engine.coins]
+        )
+
+    def _children(self, engine, board_hash):
+        """(reward, hash, action) for every move, most promising first.
+
+        Every move is stepped and undone on engine itself, positions are not
+        copied.
+        """
+        actions = list(engine.legal_actions()) or [None]
+        children = []
+        for action in actions:
+            child_hash = board_hash
+            if action is not None:
+                explore_card = engine.explore_card
+                tile_type = TILES_DICT[explore_card.types[action.type_index]].val
+                for col, row in action.cells(explore_card):
+                    child_hash ^= self.zobrist[col * engine.size + row][tile_type]
+            score = engine.score
+            engine.step(action)
+            children.append(
+                (evaluate(engine), engine.score - score, child_hash, action)
+            )
+            engine.undo()
+        children.sort(key=lambda item: item[0], reverse=True)
+        return [child[1:] for child in children]
+
+    def _search_child(self, engine, action, child_hash):
+        engine.step(action)
+        try:
+            return self._search(engine, child_hash)
+        finally:
+            engine.undo()
+
+    def _search(self, engine, board_hash):
+        """(value, exact, line) of the points still to come from engine.
+
+        Unless exact, value is an upper bound and no better than needed to
+        beat the best game found so far.
+        """
+        self.nodes += 1
+        if (
+            self.nodes & 255 == 0
+            and self._deadline
+            and time.perf_counter() > (self._deadline)
+        ):
+            raise _Timeout
+        if self._finished(engine):
+            if engine.score > self.best_score:
+                self.best_score = engine.score
+                self.best_line = [action for _, action in engine.history]
+            return 0, True, ()
+
+        need = self.best_score - engine.score
+        key = self._key(board_hash, engine)
+        entry = self.table.get(key)
+        if entry is not None:
+            _, _, value, exact, line = entry
+            if exact:
+                self._improve(engine, value, line)
+                return value, True, line
+            if value <= need:
+                return value, False, ()
+        bound = self.bound(engine)
+        if bound <= need:
+            return bound, False, ()
+
+        best_exact, best_line, best_upper = -math.inf, (), -math.inf
+        for reward, child_hash, action in self._children(engine, board_hash):
+            value, exact, line = self._search_child(engine, action, child_hash)
+            if exact and reward + value > best_exact:
+                best_exact, best_line = reward + value, (action,) + line
+            elif not exact:
+                best_upper = max(best_upper, reward + value)
+        exact = best_exact >= best_upper
+        value = best_exact if exact else best_upper
+        self.table.put(key, len(engine.history), value, exact, best_line)
+        return value, exact, best_line
+
+    def _improve(self, engine, value, line):
+        """Take over a transposed line if it beats the best game found."""
+        if engine.score + value > self.best_score:
+            self.best_score = engine.score + value
+            self.best_line = [action for _, action in engine.history] + list(line)
+
+    def solve(self):
+        """Search until the optimum is proven or time runs out, returns report()."""
+        start = time.perf_counter()
+        self._deadline = start + self.time_limit if self.time_limit else None
+        root = self.root
+        if self._finished(root):
+            pending, bounds = [], [0]
+            self._search(root, self.root_hash)
+        else:
+            pending = self._children(root, self.root_hash)
+            # best bound over the root moves not yet searched to the end
+            bounds = []
+            for reward, _, action in pending:
+                root.step(action)
+                bounds.append(reward + self.bound(root))
+                root.undo()
+        self.upper_bound = root.score + max(bounds)
+        try:
+            for index, (reward, child_hash, action) in enumerate(pending):
+                value, exact, _ = self._search_child(root, action, child_hash)
+                bounds[index] = reward + value
+                self.upper_bound = root.score + max(bounds)
+            self.upper_bound = min(self.upper_bound, self.best_score)
+        except _Timeout:
+            pass
+        self.upper_bound = max(self.upper_bound, self.best_score)
+        self.elapsed = time.perf_counter() - start
+        return self.report()
+
+    @property
+    def proven(self):
+        return self.best_score == self.upper_bound
+
+    def report(self):
+        return {
+            "seed": self.seed,
+            "seasons": self.seasons,
+            "edicts": {key: card.name for key, card in self.edicts.items()},
+            "best_score": self.best_score,
+            "upper_bound": self.upper_bound,
+            "proven": self.proven,
+            "nodes": self.nodes,
+            "nodes_per_second": round(self.nodes / self.elapsed) if self.elapsed else 0,
+            "tt_probes": self.table.probes,
+            "tt_hit_rate": round(self.table.hit_rate, 4),
+            "elapsed_s": round(self.elapsed, 2),
+            "line": [repr(action) for action in self.best_line or []],
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--time", type=float, default=60, help="time limit in seconds")
+    parser.add_argument(
+        "--seasons", type=int, default=len(SEASONS), help="only solve the first seasons"
+    )
+    parser.add_argument("--tt-size", type=int, default=TT_SIZE, help="table slots")
+    parser.add_argument(
+        "--play", type=int, default=0, help="turns to play with --policy first"
+    )
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="greedy")
+    args = parser.parse_args(argv)
+
+    engine = GameEngine(args.seed, *deal_game(args.seed))
+    policy = make_policy(args.policy, args.seed)
+    opening = []
+    for _ in range(args.play):
+        if engine.done:
+            break
+        opening.append(policy.choose(engine))
+        engine.step(opening[-1])
+    solver = Solver(args.seed, args.seasons, args.tt_size, args.time, opening)
+    print(json.dumps(solver.solve(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""Seeded random boards, the scoring cards and reference scores for the tests."""
+
+from cards import SCORING_CARDS
+from tiles import NORMAL_MAP, TILES_DICT
+
+CARDS = [card for stack in SCORING_CARDS.values() for card in stack]
+CARDS_BY_NAME = {card.name: card for card in CARDS}
+# scoring functions with list, bitboard and batch versions
+SCORING_FUNCTIONS = ["borderlands", "wildholds", "canallake", "sentinelwood"]
+
+# terrains a player can place
+TERRAINS = [
+    tile.val for name, tile in TILES_DICT.items() if name not in ("empty", "mountain")
+]
+
+
+def random_board(rng, fill=None):
+    """Normal map with a random share of its empty cells filled at random."""
+    board = NORMAL_MAP.board()
+    fill = rng.random() if fill is None else fill
+    for column in board:
+        for row, tile_type in enumerate(column):
+            if tile_type == 0 and rng.random() < fill:
+                column[row] = rng.choice(TERRAINS)
+    return board
+
+
+def full_scores(engine):
+    """Edict scores of the engine's board, rescored from scratch."""
+    return {key: card.score(engine.board) for key, card in engine.edicts.items()}
@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+import scoring_algorithms
+from boards import CARDS, SCORING_FUNCTIONS, random_board
+
+
+def random_boards(rng, count=64):
+    return [random_board(rng) for _ in range(count)]
+
+
+@pytest.mark.parametrize("name", SCORING_FUNCTIONS)
+def test_batch_scores_match_list_scores(rng, name):
+    batch_score = getattr(scoring_algorithms, "batch_score_" + name)
+    list_score = getattr(scoring_algorithms, "score_" + name)
+    boards = random_boards(rng)
+    expected = [list_score(board) for board in boards]
+    assert batch_score(np.array(boards, dtype=np.uint8)).tolist() == expected
+
+
+@pytest.mark.parametrize("card", CARDS, ids=lambda card: card.name)
+def test_card_batch_scores_match_single_scores(rng, card):
+    boards = random_boards(rng, 16)
+    expected = [card.score(board) for board in boards]
+    assert card.batch_score(np.array(boards, dtype=np.uint8)).tolist() == expected
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+import bitboard
+import scoring_algorithms
+from bitboard import BitBoard
+from boards import CARDS, SCORING_FUNCTIONS, random_board
+
+
+def test_round_trip(rng):
+    for _ in range(50):
+        board = random_board(rng)
+        assert BitBoard.from_board(board).to_board() == board
+
+
+@pytest.mark.parametrize("name", SCORING_FUNCTIONS)
+def test_bitboard_scores_match_list_scores(rng, name):
+    bit_score = getattr(bitboard, "score_" + name)
+    list_score = getattr(scoring_algorithms, "score_" + name)
+    for _ in range(100):
+        board = random_board(rng)
+        assert bit_score(BitBoard.from_board(board)) == list_score(board)
+
+
+@pytest.mark.parametrize("card", CARDS, ids=lambda card: card.name)
+def test_cards_score_bitboards_like_lists(rng, card):
+    for _ in range(20):
+        board = random_board(rng)
+        assert card.score(BitBoard.from_board(board)) == card.score(board)
+
+
+@pytest.mark.parametrize("size", [1, 11, 64, 65, 200])
+def test_full_lines_on_small_and_large_boards(size):
+    rng = np.random.default_rng(size)
+    for fill in [0.0, 0.9, 1.0]:
+        cells = rng.random((size, size)) < fill
+        cells[rng.integers(size), :] = True
+        cells[:, rng.integers(size)] = True
+        expected = np.count_nonzero(cells.all(axis=0)) + np.count_nonzero(
+            cells.all(axis=1)
+        )
+        assert bitboard.full_lines(bitboard.from_array(cells), size) == expected
@@ -0,0 +1,12 @@
+from bot import Bot
+from engine import GameEngine, deal_game
+
+
+def test_determinized_games_do_not_see_later_decks():
+    edicts, decks = deal_game(3)
+    engine = GameEngine(3, edicts, decks)
+    state = Bot("beam", 100, seed=0)._determinize(engine)
+    assert state.decks is None
+    while not state.done:
+        state.step(next(state.legal_actions(), None))
+    assert state.deck_orders[1:] != [list(deck) for deck in decks[1:]]
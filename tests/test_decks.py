@@ -0,0 +1,52 @@
+import numpy as np
+
+from cards import EXPLORE_CARDS, SCORING_CARDS
+from decks import SCORING, DeckEngine
+from engine import EDICTS, SEASONS, GameEngine
+
+GAMES = [0, 1, 2, 17, 5, 1 << 40, 3]
+
+
+def test_deal_arrays_match_deal():
+    deck_engine = DeckEngine(7)
+    edicts, decks = deck_engine.deal_arrays(GAMES)
+    assert edicts.shape == (len(GAMES), len(EDICTS))
+    assert decks.shape == (len(GAMES), len(SEASONS), len(EXPLORE_CARDS))
+    for game, game_edicts, game_decks in zip(GAMES, edicts, decks):
+        dealt_edicts, dealt_decks = deck_engine.deal(game)
+        assert dealt_edicts == {
+            key: SCORING[index] for key, index in zip(EDICTS, game_edicts)
+        }
+        assert dealt_decks == [
+            [EXPLORE_CARDS[index] for index in deck] for deck in game_decks
+        ]
+
+
+def test_games_are_dealt_the_same_in_any_batch():
+    edicts, decks = DeckEngine(7).deal_arrays(GAMES)
+    for index, game in enumerate(GAMES):
+        game_edicts, game_decks = DeckEngine(7).deal_arrays([game])
+        assert (game_edicts[0] == edicts[index]).all()
+        assert (game_decks[0] == decks[index]).all()
+    _, other_decks = DeckEngine(8).deal_arrays(GAMES)
+    assert (other_decks != decks).any()
+
+
+def test_deals_are_legal():
+    edicts, decks = DeckEngine(0).deal_arrays(np.arange(200))
+    categories = [category for category, stack in SCORING_CARDS.items() for _ in stack]
+    for game_edicts in edicts:
+        assert sorted(categories[index] for index in game_edicts) == sorted(
+            SCORING_CARDS
+        )
+    assert (np.sort(decks, axis=2) == np.arange(len(EXPLORE_CARDS))).all()
+
+
+def test_engine_plays_the_dealt_decks():
+    deck_engine = DeckEngine(DeckEngine(3).seed)
+    edicts, decks = deck_engine.deal(12)
+    engine = GameEngine(12, edicts, decks)
+    while not engine.done:
+        engine.step(next(engine.legal_actions(), None))
+    assert engine.edicts == edicts
+    assert engine.deck_orders == decks
@@ -0,0 +1,131 @@
+import random
+
+import pytest
+
+from boards import CARDS, full_scores
+from engine import EDICTS, Action, GameEngine, deal_game
+
+
+def state(engine):
+    """Everything a step can change."""
+    return (
+        [column.copy() for column in engine.board],
+        engine.occupied,
+        engine.mountain_coins,
+        engine.monsters,
+        engine.coins,
+        engine.timecost,
+        engine.season_index,
+        engine.done,
+        engine.score,
+        [scores.copy() for scores in engine.season_scores],
+        len(engine.deck_orders),
+        engine.history.copy(),
+        engine.explore_cards.copy(),
+        engine.explore_card and (engine.explore_card.name, engine.explore_card.types),
+        engine.scorer.scores,
+        engine.rng.getstate(),
+    )
+
+
+def random_engine(game, rng, decks=True):
+    edicts = dict(zip(EDICTS, rng.sample(CARDS, len(EDICTS))))
+    return GameEngine(game, edicts, deal_game(game)[1] if decks else None)
+
+
+@pytest.mark.parametrize("decks", [True, False])
+def test_undo_restores_every_earlier_state(decks):
+    rng = random.Random(0)
+    for game in range(15):
+        engine = random_engine(game, rng, decks)
+        states = [state(engine)]
+        while not engine.done:
+            actions = list(engine.legal_actions())
+            engine.step(rng.choice(actions) if actions else None)
+            states.append(state(engine))
+            if rng.random() < 0.3:
+                for _ in range(rng.randint(1, min(3, len(states) - 1))):
+                    engine.undo()
+                    states.pop()
+                    assert state(engine) == states[-1]
+                    assert engine.scorer.scores == full_scores(engine)
+        while engine.undo_stack:
+            engine.undo()
+            states.pop()
+            assert state(engine) == states[-1]
+        with pytest.raises(ValueError):
+            engine.undo()
+
+
+def test_depth_first_step_and_undo():
+    rng = random.Random(1)
+
+    def search(engine, depth):
+        if depth == 0 or engine.done:
+            return
+        actions = list(engine.legal_actions()) or [None]
+        actions = rng.sample(actions, min(3, len(actions)))
+        # every move twice, the second time replays scores kept by the undo
+        for _ in range(2):
+            for action in actions:
+                before = state(engine)
+                engine.step(action)
+                assert engine.scorer.scores == full_scores(engine)
+                search(engine, depth - 1)
+                engine.undo()
+                assert state(engine) == before
+
+    for game in range(4):
+        engine = random_engine(game, rng)
+        for _ in range(game * 5):
+            engine.step(rng.choice(list(engine.legal_actions()) or [None]))
+        search(engine, 3)
+
+
+@pytest.mark.parametrize(
+    "index",
+    [
+        {"shape_index": -1},
+        {"shape_index": 9},
+        {"type_index": -1},
+        {"type_index": 9},
+        {"orientation": -1},
+        {"orientation": 8},
+    ],
+)
+def test_out_of_range_indices_are_illegal(index):
+    engine = GameEngine(0)
+    action = next(engine.legal_actions())
+    fields = {
+        "shape_index": action.shape_index,
+        "type_index": action.type_index,
+        "orientation": action.orientation,
+    }
+    bad = Action(action.pos, **{**fields, **index})
+    assert not engine.is_legal(bad)
+    with pytest.raises(ValueError):
+        engine.step(bad)
+    assert not engine.history and not engine.undo_stack
+
+
+def test_engine_fed_the_dealt_cards_follows_the_dealt_game():
+    rng = random.Random(2)
+    for game in range(10):
+        dealt = random_engine(game, rng)
+        engine = GameEngine(game + 100, dealt.edicts)
+        while not dealt.done:
+            engine.replace_explore_card(dealt.explore_card.name)
+            assert engine.explore_card.types == dealt.explore_card.types
+            action = rng.choice(list(dealt.legal_actions()) or [None])
+            dealt.step(action)
+            engine.step(action)
+            if rng.random() < 0.2 and not dealt.done:
+                dealt.undo()
+                engine.undo()
+                assert engine.explore_card.name == dealt.explore_card.name
+        assert engine.season_scores == dealt.season_scores
+        # deck_orders holds the cards in the order they were drawn
+        replayed = GameEngine(game, dealt.edicts, engine.deck_orders)
+        for _, action in engine.history:
+            replayed.step(action)
+        assert replayed.season_scores == dealt.season_scores
@@ -0,0 +1,34 @@
+import random
+
+import pytest
+
+from boards import CARDS, full_scores
+from engine import EDICTS, GameEngine
+from tiles import TILES_DICT
+
+# every card is an edict of at least one game
+GAMES = range(-(-len(CARDS) // len(EDICTS)))
+
+
+@pytest.mark.parametrize("game", GAMES)
+def test_running_scores_match_full_rescoring(game):
+    rng = random.Random(game)
+    cards = [CARDS[(game * len(EDICTS) + i) % len(CARDS)] for i in range(len(EDICTS))]
+    engine = GameEngine(game, dict(zip(EDICTS, cards)))
+    while not engine.done:
+        actions = list(engine.legal_actions())
+        # what placing a few of the actions would add, without placing them
+        for action in rng.sample(actions, min(3, len(actions))):
+            explore_card = engine.explore_card
+            cells = action.cells(explore_card)
+            tile_type = TILES_DICT[explore_card.types[action.type_index]].val
+            before = full_scores(engine)
+            for col, row in cells:
+                engine.board[col][row] = tile_type
+            after = full_scores(engine)
+            for col, row in cells:
+                engine.board[col][row] = 0
+            delta = engine.scorer.delta(cells, tile_type)
+            assert delta == {key: after[key] - before[key] for key in before}
+        engine.step(rng.choice(actions) if actions else None)
+        assert engine.scorer.scores == full_scores(engine)
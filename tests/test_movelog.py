@@ -0,0 +1,89 @@
+import pytest
+
+import movelog
+from engine import GameEngine
+from tiles import MapLayout
+
+
+def random_game(seed, rng):
+    engine = GameEngine(seed)
+    while not engine.done:
+        engine.step(rng.choice(list(engine.legal_actions()) or [None]))
+    return engine
+
+
+def key(explore_card, action):
+    if action is None:
+        # a log does not keep the card nothing could be drawn for
+        return None
+    return (
+        (explore_card.name, explore_card.types, explore_card.shapes),
+        (action.pos, action.shape_index, action.type_index, action.orientation),
+    )
+
+
+def engine_state(engine):
+    return (
+        engine.board,
+        engine.coins,
+        engine.score,
+        engine.season_index,
+        engine.season_scores,
+        engine.explore_card and engine.explore_card.name,
+    )
+
+
+@pytest.mark.parametrize("seed", [None, 0, 7, -(1 << 63), (1 << 63) - 1])
+def test_encode_decode_round_trip(rng, seed):
+    engine = random_game(seed, rng)
+    game_log = movelog.GameLog.from_engine(engine)
+    decoded = movelog.decode(movelog.encode(game_log))
+    assert decoded.seed == seed
+    assert decoded.edicts == engine.edicts
+    assert decoded.decks == engine.deck_orders
+    assert [key(*turn) for turn in decoded.history] == [
+        key(*turn) for turn in engine.history
+    ]
+
+
+def test_replay_reproduces_every_turn(rng):
+    for seed in range(5):
+        engine = random_game(seed, rng)
+        game_log = movelog.decode(movelog.encode(movelog.GameLog.from_engine(engine)))
+        replayed = movelog.replay(game_log)
+        assert replayed.done
+        assert engine_state(replayed) == engine_state(engine)
+        for turn in reversed(range(len(engine.history))):
+            engine.undo()
+            assert engine_state(movelog.replay(game_log, turn)) == engine_state(engine)
+
+
+def test_logs_written_and_read_back(rng, tmp_path):
+    engines = [random_game(seed, rng) for seed in range(3)]
+    path = tmp_path / "games.cgl"
+    movelog.write_logs(path, [movelog.GameLog.from_engine(engines[0])])
+    movelog.write_logs(
+        path, [movelog.encode(movelog.GameLog.from_engine(e)) for e in engines[1:]]
+    )
+    game_logs = list(movelog.read_logs(path))
+    assert [game_log.seed for game_log in game_logs] == [0, 1, 2]
+    for game_log, engine in zip(game_logs, engines):
+        assert engine_state(movelog.replay(game_log)) == engine_state(engine)
+
+
+@pytest.mark.parametrize("seed", [1 << 63, -(1 << 63) - 1, "seed", 1.5])
+def test_unloggable_seeds_are_rejected(seed):
+    game_log = movelog.GameLog.from_engine(GameEngine(0))
+    game_log.seed = seed
+    with pytest.raises(ValueError):
+        movelog.encode(game_log)
+
+
+def test_only_the_normal_map_is_logged():
+    with pytest.raises(ValueError):
+        movelog.GameLog.from_engine(GameEngine(0, layout=MapLayout.tiled(22)))
+
+
+def test_other_data_is_not_a_game_log():
+    with pytest.raises(ValueError):
+        movelog.decode(b"\0" * movelog.HEADER.size)
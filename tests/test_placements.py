@@ -0,0 +1,82 @@
+from collections import Counter
+
+import pytest
+
+from bitboard import BitBoard
+from boards import random_board
+from cards import EXPLORE_CARDS
+from engine import fallback_card, legal_placements
+from shapes import ORIENTATIONS, orient_shape
+from tiles import NORMAL_MAP
+
+
+def placed(explore_card, action):
+    return (
+        action.shape_index,
+        action.type_index,
+        frozenset(action.cells(explore_card)),
+    )
+
+
+def brute_force_placements(board, explore_card):
+    """Every placement of the card on empty cells, tried at every position."""
+    size = len(board)
+    found = set()
+    for shape_index, shape in enumerate(explore_card.shapes):
+        for orientation in range(ORIENTATIONS):
+            offsets = orient_shape(shape, orientation)
+            reach = max(max(abs(col), abs(row)) for col, row in offsets)
+            for x in range(-reach, size + reach):
+                for y in range(-reach, size + reach):
+                    cells = frozenset((x + col, y + row) for col, row in offsets)
+                    if all(
+                        0 <= col < size and 0 <= row < size and board[col][row] == 0
+                        for col, row in cells
+                    ):
+                        for type_index in range(len(explore_card.types)):
+                            found.add((shape_index, type_index, cells))
+    return found
+
+
+@pytest.mark.parametrize("explore_card", EXPLORE_CARDS, ids=lambda card: card.name)
+def test_legal_placements_match_brute_force(rng, explore_card):
+    for fill in [0, 0.3, 0.7, None]:
+        board = random_board(rng, fill)
+        for bits in [False, True]:
+            actions = legal_placements(
+                BitBoard.from_board(board) if bits else board, explore_card
+            )
+            found = Counter(placed(explore_card, action) for action in actions)
+            # orientations that cover the same cells are yielded once
+            assert max(found.values(), default=1) == 1
+            assert set(found) == brute_force_placements(board, explore_card)
+
+
+def test_placements_reach_the_edges_but_not_the_mountains():
+    board = NORMAL_MAP.board()
+    size = len(board)
+    cells = set()
+    for explore_card in EXPLORE_CARDS:
+        for action in legal_placements(board, explore_card):
+            cells.update(action.cells(explore_card))
+    mountains = set(NORMAL_MAP.mountains)
+    assert not cells & mountains
+    assert cells | mountains == {
+        (col, row) for col in range(size) for row in range(size)
+    }
+
+
+def test_fallback_fits_any_empty_cell(rng):
+    explore_card = fallback_card(EXPLORE_CARDS[0])
+    board = random_board(rng, 0.9)
+    empty = {
+        (col, row)
+        for col, column in enumerate(board)
+        for row, tile_type in enumerate(column)
+        if tile_type == 0
+    }
+    cells = {
+        action.cells(explore_card)[0]
+        for action in legal_placements(board, explore_card)
+    }
+    assert cells == empty
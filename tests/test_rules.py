@@ -0,0 +1,248 @@
+"""The rule language cards against brute force scorers written from the card text."""
+
+import pytest
+
+from boards import CARDS_BY_NAME, random_board
+from tiles import NORMAL_MAP, TILES_DICT
+
+EMPTY = TILES_DICT["empty"].val
+WATER = TILES_DICT["water"].val
+FARM = TILES_DICT["farm"].val
+VILLAGE = TILES_DICT["village"].val
+FOREST = TILES_DICT["forest"].val
+MOUNTAIN = TILES_DICT["mountain"].val
+
+
+def neighbours(board, col, row):
+    """The four neighbouring tiles, None for the cells around the map."""
+    size = len(board)
+    for c, r in [(col + 1, row), (col - 1, row), (col, row + 1), (col, row - 1)]:
+        yield board[c][r] if 0 <= c < size and 0 <= r < size else None
+
+
+def neighbour_cells(board, col, row):
+    size = len(board)
+    for c, r in [(col + 1, row), (col - 1, row), (col, row + 1), (col, row - 1)]:
+        if 0 <= c < size and 0 <= r < size:
+            yield c, r
+
+
+def cells(board, tile_type=None):
+    for col, column in enumerate(board):
+        for row, tile in enumerate(column):
+            if tile_type is None or tile == tile_type:
+                yield col, row
+
+
+def clusters(board, tile_type):
+    """Sets of cells of the orthogonally connected groups of tile_type."""
+    seen = set()
+    for cell in cells(board, tile_type):
+        if cell in seen:
+            continue
+        cluster, stack = set(), [cell]
+        while stack:
+            col, row = stack.pop()
+            if (col, row) in cluster:
+                continue
+            cluster.add((col, row))
+            for c, r in neighbour_cells(board, col, row):
+                if board[c][r] == tile_type:
+                    stack.append((c, r))
+        seen |= cluster
+        yield cluster
+
+
+def bordering(board, cluster):
+    """Tiles next to the cluster, None for the map edge."""
+    tiles = []
+    for col, row in cluster:
+        for (c, r), tile in zip(
+            [(col + 1, row), (col - 1, row), (col, row + 1), (col, row - 1)],
+            neighbours(board, col, row),
+        ):
+            if (c, r) not in cluster:
+                tiles.append(tile)
+    return tiles
+
+
+def enclosed(board, col, row):
+    return all(tile is None or tile != EMPTY for tile in neighbours(board, col, row))
+
+
+def treetower(board):
+    return sum(enclosed(board, col, row) for col, row in cells(board, FOREST))
+
+
+def greenbough(board):
+    columns = sum(FOREST in column for column in board)
+    rows = sum(FOREST in [column[row] for column in board] for row in range(len(board)))
+    return columns + rows
+
+
+def stoneside_forest(board):
+    linked = set()
+    for cluster in clusters(board, FOREST):
+        mountains = {
+            (c, r)
+            for col, row in cluster
+            for c, r in neighbour_cells(board, col, row)
+            if board[c][r] == MOUNTAIN
+        }
+        if len(mountains) >= 2:
+            linked |= mountains
+    return 3 * len(linked)
+
+
+def greengold_plains(board):
+    return 3 * sum(
+        len({tile for tile in bordering(board, cluster) if tile}) >= 3
+        for cluster in clusters(board, VILLAGE)
+    )
+
+
+def great_city(board):
+    sizes = [
+        len(cluster)
+        for cluster in clusters(board, VILLAGE)
+        if MOUNTAIN not in bordering(board, cluster)
+    ]
+    return max(sizes, default=0)
+
+
+def shieldgate(board):
+    sizes = sorted((len(cluster) for cluster in clusters(board, VILLAGE)), reverse=True)
+    return 2 * sizes[1] if len(sizes) > 1 else 0
+
+
+def mages_valley(board):
+    score = 0
+    for col, row in cells(board):
+        if MOUNTAIN in neighbours(board, col, row):
+            score += {WATER: 2, FARM: 1}.get(board[col][row], 0)
+    return score
+
+
+def shoreside_expanse(board):
+    score = 0
+    for tile_type, other in [(FARM, WATER), (WATER, FARM)]:
+        for cluster in clusters(board, tile_type):
+            tiles = bordering(board, cluster)
+            if None not in tiles and other not in tiles:
+                score += 3
+    return score
+
+
+def the_broken_road(board):
+    size = len(board)
+    return 3 * sum(
+        all(board[col][col + offset] != EMPTY for col in range(size - offset))
+        for offset in range(size)
+    )
+
+
+def lost_barony(board):
+    size = len(board)
+    return 3 * max(
+        (
+            side
+            for side in range(1, size + 1)
+            for col in range(size - side + 1)
+            for row in range(size - side + 1)
+            if all(
+                board[c][r] != EMPTY
+                for c in range(col, col + side)
+                for r in range(row, row + side)
+            )
+        ),
+        default=0,
+    )
+
+
+def the_cauldrons(board):
+    return sum(enclosed(board, col, row) for col, row in cells(board, EMPTY))
+
+
+REFERENCES = {
+    "Treetower": treetower,
+    "Greenbough": greenbough,
+    "Stoneside Forest": stoneside_forest,
+    "Greengold Plains": greengold_plains,
+    "Great City": great_city,
+    "Shieldgate": shieldgate,
+    "Mages Valley": mages_valley,
+    "Shoreside Expanse": shoreside_expanse,
+    "The Broken Road": the_broken_road,
+    "Lost Barony": lost_barony,
+    "The Cauldrons": the_cauldrons,
+}
+
+
+def board_from_rows(rows):
+    """Board out of one string per row, . empty and w, f, v, t (forest), m terrains."""
+    tiles = {
+        ".": EMPTY,
+        "w": WATER,
+        "f": FARM,
+        "v": VILLAGE,
+        "t": FOREST,
+        "m": MOUNTAIN,
+    }
+    return [[tiles[line[col]] for line in rows] for col in range(len(rows[0]))]
+
+
+@pytest.mark.parametrize("name", sorted(REFERENCES))
+def test_rule_cards_match_brute_force_scores(rng, name):
+    card, reference = CARDS_BY_NAME[name], REFERENCES[name]
+    for _ in range(40):
+        board = random_board(rng)
+        assert card.score(board) == reference(board)
+
+
+@pytest.mark.parametrize("name", sorted(REFERENCES))
+def test_rule_cards_on_the_full_and_empty_map(name):
+    card, reference = CARDS_BY_NAME[name], REFERENCES[name]
+    board = NORMAL_MAP.board()
+    assert card.score(board) == reference(board)
+    for col, row in cells(board, EMPTY):
+        board[col][row] = FOREST
+    assert card.score(board) == reference(board)
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        # the forest in the corner and the two between filled cells
+        ("Treetower", 3),
+        # rows 0 to 2, columns 0 and 1
+        ("Greenbough", 5),
+        # the forests on the left link two mountains
+        ("Stoneside Forest", 6),
+        # the upper villages border forest, farm and water
+        ("Greengold Plains", 3),
+        # the lower villages border a mountain
+        ("Great City", 3),
+        ("Shieldgate", 4),
+        ("Mages Valley", 3),
+        # the two inner farms, every water touches the edge
+        ("Shoreside Expanse", 6),
+        # the diagonal starting right below the top left corner
+        ("The Broken Road", 3),
+        # the filled 2x2 square in the top left corner
+        ("Lost Barony", 6),
+        ("The Cauldrons", 2),
+    ],
+)
+def test_rule_cards_on_a_hand_built_board(name, expected):
+    board = board_from_rows(
+        [
+            "tvvvw.",
+            "mtf..m",
+            "tt...f",
+            "m.vv..",
+            ".f.m..",
+            "...wf.",
+        ]
+    )
+    assert REFERENCES[name](board) == expected
+    assert CARDS_BY_NAME[name].score(board) == expected
@@ -0,0 +1,44 @@
+import copy
+
+import numpy as np
+import pytest
+
+from bitboard import BitBoard
+from boards import CARDS, random_board
+from score_cache import ScoreCache, board_key, key_bytes
+
+
+@pytest.mark.parametrize("card", CARDS, ids=lambda card: card.name)
+def test_cached_scores_match_uncached(rng, card):
+    memoized = copy.copy(card)
+    memoized.memoize(8)
+    boards = [random_board(rng) for _ in range(12)]
+    # the second round hits the cache for the boards still in it
+    for board in boards + boards[::-1]:
+        for scored in (board, np.array(board), BitBoard.from_board(board)):
+            assert memoized.score(scored) == card.score(scored)
+    assert memoized.cache.hits and memoized.cache.misses
+
+
+def test_keys_of_equal_boards(rng):
+    board = random_board(rng)
+    assert board_key(board) == board_key(np.array(board))
+    assert board_key(BitBoard.from_board(board)) != board_key(board)
+
+
+def test_least_recently_used_board_is_evicted():
+    cache = ScoreCache(2)
+    cache.put(b"a", 1)
+    cache.put(b"b", 2)
+    assert cache.get(b"a") == 1
+    cache.put(b"c", 3)
+    assert cache.get(b"b") is None
+    assert cache.get(b"a") == 1 and cache.get(b"c") == 3
+
+
+def test_keys_are_capped_by_bytes():
+    cache = ScoreCache(1 << 16, maxbytes=1000)
+    for index in range(100):
+        cache.put(bytes([index]) * 100, index)
+    assert len(cache) == 10
+    assert cache.bytes == sum(key_bytes(key) for key in cache.scores) <= 1000
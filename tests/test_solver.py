@@ -0,0 +1,81 @@
+from boards import CARDS_BY_NAME, TERRAINS, random_board
+from engine import GameEngine, deal_game
+from solver import CELL_GAINS, FILLED_BOUNDS, Solver
+from tiles import NORMAL_MAP
+
+# a game whose last two turns have few moves and fast winter edicts
+ENDGAME_SEED = 34
+
+
+def exhaustive_best_score(engine):
+    if engine.done:
+        return engine.score
+    best = None
+    for action in list(engine.legal_actions()) or [None]:
+        engine.step(action)
+        score = exhaustive_best_score(engine)
+        engine.undo()
+        best = score if best is None else max(best, score)
+    return best
+
+
+def test_cell_gains_bound_one_cell(rng):
+    for _ in range(200):
+        board = random_board(rng)
+        empty = [
+            (col, row)
+            for col, column in enumerate(board)
+            for row, tile_type in enumerate(column)
+            if tile_type == 0
+        ]
+        if not empty:
+            continue
+        col, row = rng.choice(empty)
+        tile_type = rng.choice(TERRAINS)
+        for name, gain in CELL_GAINS.items():
+            before = CARDS_BY_NAME[name].score(board)
+            board[col][row] = tile_type
+            after = CARDS_BY_NAME[name].score(board)
+            board[col][row] = 0
+            assert after - before <= gain, name
+
+
+def test_filled_bounds(rng):
+    for _ in range(200):
+        board = random_board(rng)
+        filled = sum(tile_type != 0 for column in board for tile_type in column)
+        for name, bound in FILLED_BOUNDS.items():
+            assert CARDS_BY_NAME[name].score(board) <= bound(
+                filled, NORMAL_MAP.size
+            ), name
+
+
+def test_lost_barony_gains_more_than_one_side_from_a_cell():
+    board = [[0] * NORMAL_MAP.size for _ in range(NORMAL_MAP.size)]
+    for col in range(3):
+        for row in range(3):
+            board[col][row] = TERRAINS[0]
+    board[1][1] = 0
+    lost_barony = CARDS_BY_NAME["Lost Barony"]
+    assert lost_barony.score(board) == 3
+    board[1][1] = TERRAINS[0]
+    assert lost_barony.score(board) == 9
+    assert lost_barony.score(board) <= FILLED_BOUNDS["Lost Barony"](9, len(board))
+
+
+def test_solver_proves_the_endgame_optimum():
+    engine = GameEngine(ENDGAME_SEED, *deal_game(ENDGAME_SEED))
+    turns = len(Solver(ENDGAME_SEED).cells) - 1
+    opening = []
+    while len(opening) < turns - 2:
+        opening.append(next(engine.legal_actions(), None))
+        engine.step(opening[-1])
+
+    solver = Solver(ENDGAME_SEED, opening=opening)
+    report = solver.solve()
+    assert report["proven"]
+    assert report["best_score"] == exhaustive_best_score(engine)
+
+    for action in solver.best_line[len(opening) :]:
+        engine.step(action)
+    assert engine.done and engine.score == solver.best_score
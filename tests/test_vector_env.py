@@ -0,0 +1,61 @@
+import numpy as np
+
+from cards import EXPLORE_CARDS
+from engine import FALLBACK_TYPES, GameEngine
+from vector_env import FALLBACK, N_PLACEMENTS, N_TYPES, PASS, VectorEnv
+
+
+def key(action):
+    return action and (
+        action.pos,
+        action.shape_index,
+        action.type_index,
+        action.orientation,
+    )
+
+
+def legal_actions(env, index, mask):
+    return {key(env.action(index, action)) for action in np.flatnonzero(mask)}
+
+
+def test_vector_env_steps_like_game_engines(rng):
+    env = VectorEnv(8, seed=3)
+    observation, info = env.reset()
+    engines = [GameEngine(int(game), *env.deck_engine.deal(game)) for game in env.game]
+    finished = 0
+    while finished < 2 * env.num_envs:
+        mask = env.action_mask()
+        assert (
+            mask[:, :PASS].reshape(env.num_envs, N_TYPES, N_PLACEMENTS)
+            == info["type_mask"][:, :, np.newaxis]
+            & info["placement_mask"][:, np.newaxis, :]
+        ).all()
+        actions = []
+        for index, engine in enumerate(engines):
+            card = engine.explore_card
+            assert EXPLORE_CARDS[env.card[index]].name == card.name
+            fallback = observation["card"][index] == FALLBACK
+            assert fallback == (card.types == FALLBACK_TYPES)
+            assert observation["season"][index] == engine.season_index
+            assert observation["timecost"][index] == engine.timecost
+            assert observation["coins"][index] == engine.coins
+            assert observation["board"][index].tolist() == engine.board
+            legal = {key(action) for action in engine.legal_actions()} or {None}
+            assert legal_actions(env, index, mask[index]) == legal
+            actions.append(rng.choice(np.flatnonzero(mask[index]).tolist()))
+
+        scores = [engine.score for engine in engines]
+        for index, engine in enumerate(engines):
+            engine.step(env.action(index, actions[index]))
+        observation, reward, terminated, truncated, info = env.step(actions)
+
+        assert not truncated.any()
+        for index, engine in enumerate(engines):
+            assert reward[index] == engine.score - scores[index]
+            assert terminated[index] == engine.done
+            if engine.done:
+                assert info["final_score"][index] == engine.score
+                finished += 1
+                # the finished game was replaced by the next one dealt
+                game = int(env.game[index])
+                engines[index] = GameEngine(game, *env.deck_engine.deal(game))
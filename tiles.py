@@ -0,0 +1,77 @@
+import random
+
+
+class Tile:
+    def __init__(self, value, image_name):
+        self.val = value
+        self.image_name = image_name
+
+
+TILES_DICT = {
+    "empty": Tile(0, "white.png"),
+    "water": Tile(1, "water.png"),
+    "farm": Tile(2, "farm.png"),
+    "village": Tile(3, "village.png"),
+    "forest": Tile(4, "forest.png"),
+    "monster": Tile(5, "monster.png"),
+    "mountain": Tile(6, "mountain.png"),
+}
+
+NR_OF_TILES = 11
+MAX_BOARD_SIZE = 1000
+
+MOUNTAINS = [(3, 1), (8, 2), (5, 5), (2, 8), (7, 9)]
+
+
+class MapLayout:
+    """Size of a square map and the (col, row) positions of its mountains."""
+
+    def __init__(self, size=NR_OF_TILES, mountains=MOUNTAINS):
+        if not NR_OF_TILES <= size <= MAX_BOARD_SIZE:
+            raise ValueError(
+                f"board size {size} is not in {NR_OF_TILES}..{MAX_BOARD_SIZE}"
+            )
+        for col, row in mountains:
+            if not (0 <= col < size and 0 <= row < size):
+                raise ValueError(f"mountain {(col, row)} is off the board")
+        self.size = size
+        self.mountains = list(mountains)
+
+    @classmethod
+    def tiled(cls, size):
+        """The normal map's mountains repeated in every 11x11 block."""
+        return cls(
+            size,
+            [
+                (col + x, row + y)
+                for x in range(0, size, NR_OF_TILES)
+                for y in range(0, size, NR_OF_TILES)
+                for col, row in MOUNTAINS
+                if col + x < size and row + y < size
+            ],
+        )
+
+    @classmethod
+    def random(cls, size, density=len(MOUNTAINS) / NR_OF_TILES**2, seed=None):
+        """Mountains on random cells off the edge, about density per cell."""
+        rng = random.Random(seed)
+        count = max(1, round(density * size * size))
+        inner = (size - 2) ** 2
+        mountains = [
+            (index // (size - 2) + 1, index % (size - 2) + 1)
+            for index in rng.sample(range(inner), min(count, inner))
+        ]
+        return cls(size, mountains)
+
+    def board(self):
+        board = [[0] * self.size for _ in range(self.size)]
+        for col, row in self.mountains:
+            board[col][row] = TILES_DICT["mountain"].val
+        return board
+
+
+NORMAL_MAP = MapLayout()
+
+
+def init_normal_board():
+    return NORMAL_MAP.board()
@@ -0,0 +1,210 @@
+"""Run many seeded headless games over a pool of worker processes.
+
+Games are handed out to the workers as (seed, policy) jobs, policies are
+assigned round-robin to the seeds, so every seed is played by the same policy
+whatever the number of workers. Workers stream one result per game back to the
+parent, which writes them as JSON lines:
+
+    python tournament.py --games 10000 --workers 8 --policy random
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import time
+import traceback
+
+import numpy as np
+
+import movelog
+from dataset import BoardDataset
+from decks import DeckEngine
+from engine import GameEngine
+from policies import POLICIES, make_policy
+
+# seconds between checks that the workers are still alive
+POLL_INTERVAL = 1.0
+
+
+def play_game(seed, policy_name, record_boards=False, deck_seed=None):
+    """Play game number seed, dealt by DeckEngine(deck_seed) if that is given."""
+    if deck_seed is None:
+        engine = GameEngine(seed)
+    else:
+        engine = GameEngine(seed, *DeckEngine(deck_seed).deal(seed))
+    policy = make_policy(policy_name, seed)
+    boards = []
+    while not engine.done:
+        engine.step(policy.choose(engine))
+        if record_boards:
+            boards.append(np.array(engine.board, dtype=np.uint8))
+
+    result = {
+        "seed": seed,
+        "policy": policy_name,
+        "edicts": {key: card.name for key, card in engine.edicts.items()},
+        "season_scores": engine.season_scores,
+        "coins": engine.coins,
+        "score": engine.score,
+        "log": movelog.encode(movelog.GameLog.from_engine(engine)),
+    }
+    if record_boards:
+        result["boards"] = np.stack(boards)
+    return result
+
+
+class WorkerError(Exception):
+    """A game failed in a worker process, the message has its traceback."""
+
+
+def _worker(jobs, results, record_boards, deck_seed):
+    seed = None
+    try:
+        for seed, policy_name in iter(jobs.get, None):
+            results.put(play_game(seed, policy_name, record_boards, deck_seed))
+    except Exception:
+        results.put(WorkerError(f"game {seed} failed:\n{traceback.format_exc()}"))
+    finally:
+        results.put(None)
+
+
+def _check_workers(processes, exited):
+    """Raise WorkerError if a worker died without finishing its games."""
+    for process in processes:
+        if process.exitcode not in (None, 0):
+            raise WorkerError(
+                f"worker {process.name} exited with code {process.exitcode}"
+            )
+    if exited:
+        raise WorkerError("workers exited without reporting all their games")
+
+
+def run_tournament(
+    games, workers, policies, first_seed=0, record_boards=False, deck_seed=None
+):
+    """Yield the results of games seeded first_seed.. in completion order.
+
+    Game number i is played by policies[i % len(policies)]. Raises
+    WorkerError once a game fails in any worker.
+    """
+    if workers < 1:
+        raise ValueError("a tournament needs at least one worker")
+    jobs = multiprocessing.Queue()
+    results = multiprocessing.Queue()
+    for index in range(games):
+        jobs.put((first_seed + index, policies[index % len(policies)]))
+    for _ in range(workers):
+        jobs.put(None)
+
+    processes = [
+        multiprocessing.Process(
+            target=_worker,
+            args=(jobs, results, record_boards, deck_seed),
+            daemon=True,
+        )
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    try:
+        running = workers
+        while running:
+            # everything a worker sent is in the queue once it has exited
+            exited = all(process.exitcode is not None for process in processes)
+            try:
+                result = results.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                _check_workers(processes, exited)
+                continue
+            if result is None:
+                running -= 1
+            elif isinstance(result, WorkerError):
+                raise result
+            else:
+                yield result
+        for process in processes:
+            process.join()
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument(
+        "--policy",
+        action="append",
+        choices=sorted(POLICIES),
+        help="policy of the games, repeat to assign policies round-robin by seed",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument(
+        "--deck-seed",
+        type=int,
+        help="deal game n with decks.DeckEngine(deck_seed) instead of from seed n",
+    )
+    parser.add_argument("--output", help="write results here instead of stdout")
+    parser.add_argument("--log", help="append the binary move log of every game here")
+    parser.add_argument(
+        "--dataset", help="store the per-turn boards in a memory-mapped BoardDataset"
+    )
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    policies = args.policy or ["random"]
+    output = open(args.output, "w") if args.output else sys.stdout
+    start = time.perf_counter()
+    total = 0
+    game_logs = []
+    board_dataset = None
+    if args.dataset:
+        board_dataset = BoardDataset.create(args.dataset, args.games)
+    results = run_tournament(
+        args.games,
+        args.workers,
+        policies,
+        args.seed,
+        board_dataset is not None,
+        args.deck_seed,
+    )
+    try:
+        for result in results:
+            game_logs.append(result.pop("log"))
+            if board_dataset is not None:
+                board_dataset.write(
+                    result["seed"] - args.seed,
+                    result.pop("boards"),
+                    result["seed"],
+                    movelog.decode(game_logs[-1]).edicts,
+                    result["season_scores"],
+                    result["score"],
+                )
+            output.write(json.dumps(result) + "\n")
+            total += result["score"]
+    finally:
+        if args.log:
+            movelog.write_logs(args.log, game_logs)
+        if board_dataset is not None:
+            board_dataset.flush()
+        if output is not sys.stdout:
+            output.close()
+
+    elapsed = time.perf_counter() - start
+    if args.games:
+        print(
+            f"{args.games} games in {elapsed:.1f}s ({args.games / elapsed:.1f} "
+            f"games/s), mean score {total / args.games:.2f}",
+            file=sys.stderr,
+        )
+
+
+if __name__ == "__main__":
+    main()
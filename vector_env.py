@@ -0,0 +1,326 @@
+"""Vectorized Gym-style environment stepping many games in lockstep.
+
+VectorEnv keeps B games on the normal 11x11 map as a (B, 11, 11) array of
+boards plus per-game edicts, deck orders, season, time, coins and scores, and
+advances all of them with batched NumPy ops under the rules of engine.py:
+explore cards are drawn from the end of a shuffled deck per season, a card
+that fits nowhere is replaced by the 1x1 fallback, seasons end once their
+time is used up and score two edicts, coins and the monster penalty.
+
+Actions index a fixed table of every in-bounds placement of every shape in
+cards.EXPLORE_CARDS times a terrain slot of the card:
+
+    action = type_index * N_PLACEMENTS + placement
+
+plus PASS, which is only legal when nothing fits on the board. The legal
+actions factor into the free placements of the card's shapes and the card's
+terrains, info carries both masks; action_mask() is their full product, which
+is a lot bigger. The API follows Gymnasium's vector environments:
+
+    env = VectorEnv(1024, seed=0)
+    obs, info = env.reset()
+    while True:
+        actions = pick(obs, info["placement_mask"], info["type_mask"])
+        obs, reward, terminated, truncated, info = env.step(actions)
+
+Finished games are reset automatically unless autoreset is False, their final
+scores are in info["final_score"] (NaN for games still running).
+"""
+
+import numpy as np
+
+from adjacency import adjacent, surrounded
+from cards import EXPLORE_CARDS
+from decks import SCORING, DeckEngine
+from engine import EDICTS, FALLBACK_TYPES, MAX_COINS, MONSTER, SEASONS, Action
+from shapes import placement_masks
+from tiles import NORMAL_MAP, TILES_DICT
+
+SIZE = NORMAL_MAP.size
+N_CARDS = len(EXPLORE_CARDS)
+FALLBACK = N_CARDS  # card row of the 1x1 fallback card in the tables
+SEASON_TIME = np.array([season.time for season in SEASONS])
+SEASON_EDICTS = np.array(
+    [[EDICTS.index(key) for key in season.edicts] for season in SEASONS]
+)
+_MOUNTAINS = tuple(np.array(NORMAL_MAP.mountains).T)
+
+
+def _pack(cells):
+    """(N, SIZE, SIZE) bool arrays to (N, 2) uint64 masks, bit col * SIZE + row."""
+    padded = np.zeros((len(cells), 128), dtype=bool)
+    padded[:, : SIZE * SIZE] = cells.reshape(len(cells), -1)
+    return np.packbits(padded, axis=1, bitorder="little").view("<u8")
+
+
+def _tables():
+    cards = [(card.shapes, card.types, card.coins) for card in EXPLORE_CARDS]
+    cards.append(([[(0, 0)]], FALLBACK_TYPES, [0]))
+    shapes = {}
+    for card_shapes, _, _ in cards:
+        for shape in card_shapes:
+            shapes.setdefault(tuple(shape), len(shapes))
+
+    placement_shape, orientations, positions, bits = [], [], [], []
+    for shape, shape_id in shapes.items():
+        for orientation, pos, mask in placement_masks(shape, SIZE):
+            placement_shape.append(shape_id)
+            orientations.append(orientation)
+            positions.append(pos)
+            bits.append(mask.to_bytes(16, "little"))
+    placement_shape = np.array(placement_shape)
+    bits = np.frombuffer(b"".join(bits), dtype="<u8").reshape(-1, 2)
+    cells = np.unpackbits(bits.view(np.uint8), axis=1, bitorder="little")
+    cells = cells[:, : SIZE * SIZE].reshape(-1, SIZE, SIZE).astype(bool)
+
+    n_types = max(len(types) for _, types, _ in cards)
+    # per card the index of the card's shape every placement uses, -1 for none
+    shape_index = np.full((len(cards), len(placement_shape)), -1)
+    type_values = np.zeros((len(cards), n_types), dtype=np.uint8)
+    has_type = np.zeros((len(cards), n_types), dtype=bool)
+    coins = np.zeros((len(cards), max(len(c) for _, _, c in cards)), dtype=np.int64)
+    for row, (card_shapes, types, card_coins) in enumerate(cards):
+        for index, shape in enumerate(card_shapes):
+            shape_index[row, placement_shape == shapes[tuple(shape)]] = index
+        type_values[row, : len(types)] = [TILES_DICT[name].val for name in types]
+        has_type[row, : len(types)] = True
+        coins[row, : len(card_coins)] = card_coins
+    return (
+        np.array(orientations),
+        np.array(positions),
+        cells,
+        bits,
+        shape_index,
+        type_values,
+        has_type,
+        coins,
+    )
+
+
+(
+    PLACEMENT_ORIENTATION,
+    PLACEMENT_POS,
+    PLACEMENT_CELLS,
+    PLACEMENT_BITS,
+    PLACEMENT_SHAPE_INDEX,
+    CARD_TYPE_VALUES,
+    CARD_HAS_TYPE,
+    CARD_COINS,
+) = _tables()
+CARD_PLACEMENTS = PLACEMENT_SHAPE_INDEX >= 0
+# per card row the placements of its shapes
+CARD_COLUMNS = [np.flatnonzero(placements) for placements in CARD_PLACEMENTS]
+CARD_TIMECOST = np.array([card.timecost for card in EXPLORE_CARDS])
+N_PLACEMENTS = len(PLACEMENT_CELLS)
+N_TYPES = CARD_TYPE_VALUES.shape[1]
+PASS = N_PLACEMENTS * N_TYPES
+N_ACTIONS = PASS + 1
+
+
+class VectorEnv:
+    """num_envs games of Cartographers advanced together, see the module doc."""
+
+    def __init__(self, num_envs, seed=None, autoreset=True):
+        self.num_envs = num_envs
+        self.autoreset = autoreset
+        self.deck_engine = DeckEngine(seed)
+        # games are numbered in the order they are dealt, game k always gets
+        # the cards of deck_engine.deal(k)
+        self.games_dealt = 0
+        n = num_envs
+        self.game = np.zeros(n, dtype=np.int64)
+        self.boards = np.zeros((n, SIZE, SIZE), dtype=np.uint8)
+        # scoring cards (indices into SCORING) of edicts A-D
+        self.edicts = np.zeros((n, len(EDICTS)), dtype=np.int64)
+        # explore card indices per season, drawn from the end
+        self.decks = np.zeros((n, len(SEASONS), N_CARDS), dtype=np.int64)
+        self.draws = np.zeros(n, dtype=np.int64)
+        self.card = np.zeros(n, dtype=np.int64)
+        self.fallback = np.zeros(n, dtype=bool)
+        self.season = np.zeros(n, dtype=np.int64)
+        self.timecost = np.zeros(n, dtype=np.int64)
+        self.coins = np.zeros(n, dtype=np.int64)
+        # mountains that still pay a coin once surrounded
+        self.mountain_coins = np.zeros((n, len(NORMAL_MAP.mountains)), dtype=bool)
+        # edict, edict, coins, -monster penalty per season like engine.py
+        self.season_scores = np.zeros((n, len(SEASONS), 4), dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.done = np.zeros(n, dtype=bool)
+        self._placements = np.zeros((n, N_PLACEMENTS), dtype=bool)
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.deck_engine = DeckEngine(seed)
+            self.games_dealt = 0
+        self._reset(np.arange(self.num_envs))
+        return self._observation(), self._info()
+
+    def _reset(self, idx):
+        games = np.arange(self.games_dealt, self.games_dealt + len(idx))
+        self.games_dealt += len(idx)
+        self.game[idx] = games
+        self.boards[idx] = NORMAL_MAP.board()
+        self.edicts[idx], self.decks[idx] = self.deck_engine.deal_arrays(games)
+        self.draws[idx] = 0
+        self.season[idx] = 0
+        self.timecost[idx] = 0
+        self.coins[idx] = 0
+        self.mountain_coins[idx] = True
+        self.season_scores[idx] = 0
+        self.score[idx] = 0
+        self.done[idx] = False
+        self._draw(idx)
+
+    def _card_rows(self):
+        return np.where(self.fallback, FALLBACK, self.card)
+
+    @staticmethod
+    def _free_placements(occupied, rows):
+        """(n, N_PLACEMENTS) placements of the card rows on empty cells only.
+
+        Games are grouped by card, so only the placements of each card's own
+        shapes are tested against the packed occupied masks.
+        """
+        free = np.zeros((len(rows), N_PLACEMENTS), dtype=bool)
+        for row in np.unique(rows):
+            games = np.flatnonzero(rows == row)
+            columns = CARD_COLUMNS[row]
+            bits = PLACEMENT_BITS[columns]
+            cells = occupied[games]
+            overlap = (cells[:, np.newaxis, 0] & bits[:, 0]) | (
+                cells[:, np.newaxis, 1] & bits[:, 1]
+            )
+            free[games[:, np.newaxis], columns] = overlap == 0
+        return free
+
+    def _draw(self, idx):
+        self.card[idx] = self.decks[
+            idx, self.season[idx], N_CARDS - 1 - self.draws[idx]
+        ]
+        self.draws[idx] += 1
+        occupied = _pack(self.boards[idx] != 0)
+        placements = self._free_placements(occupied, self.card[idx])
+        fallback = ~placements.any(axis=1)
+        self.fallback[idx] = fallback
+        if fallback.any():
+            placements[fallback] = self._free_placements(
+                occupied[fallback], np.full(np.count_nonzero(fallback), FALLBACK)
+            )
+        self._placements[idx] = placements
+
+    def _info(self):
+        return {
+            "placement_mask": self._placements.copy(),
+            "type_mask": CARD_HAS_TYPE[self._card_rows()],
+        }
+
+    def action_mask(self):
+        """(num_envs, N_ACTIONS) bool mask of the legal actions of every game."""
+        mask = np.empty((self.num_envs, N_ACTIONS), dtype=bool)
+        types = CARD_HAS_TYPE[self._card_rows()]
+        np.logical_and(
+            self._placements[:, np.newaxis, :],
+            types[:, :, np.newaxis],
+            out=mask[:, :PASS].reshape(self.num_envs, N_TYPES, N_PLACEMENTS),
+        )
+        mask[:, PASS] = ~self._placements.any(axis=1) & ~self.done
+        return mask
+
+    def action(self, env_index, action_index):
+        """The engine.Action of an action index in one of the games."""
+        if action_index == PASS:
+            return None
+        type_index, placement = divmod(int(action_index), N_PLACEMENTS)
+        row = self._card_rows()[env_index]
+        return Action(
+            tuple(int(x) for x in PLACEMENT_POS[placement]),
+            int(PLACEMENT_SHAPE_INDEX[row, placement]),
+            type_index,
+            int(PLACEMENT_ORIENTATION[placement]),
+        )
+
+    def step(self, actions):
+        """Play one action per game, actions of finished games are ignored."""
+        actions = np.asarray(actions, dtype=np.int64)
+        live = ~self.done
+        type_index, placement = np.divmod(np.minimum(actions, PASS - 1), N_PLACEMENTS)
+        envs = np.arange(self.num_envs)
+        legal = np.where(
+            actions == PASS,
+            ~self._placements.any(axis=1),
+            self._placements[envs, placement]
+            & CARD_HAS_TYPE[self._card_rows(), type_index],
+        )
+        legal &= (actions >= 0) & (actions <= PASS)
+        if not legal[live].all():
+            raise ValueError(
+                f"illegal actions in games {np.flatnonzero(live & ~legal)}"
+            )
+        previous_score = self.score.copy()
+
+        play = np.flatnonzero(live & (actions != PASS))
+        placement, type_index = placement[play], type_index[play]
+        rows = self._card_rows()[play]
+        values = CARD_TYPE_VALUES[rows, type_index]
+        self.boards[play] = np.where(
+            PLACEMENT_CELLS[placement], values[:, None, None], self.boards[play]
+        )
+        coins = (
+            self.coins[play] + CARD_COINS[rows, PLACEMENT_SHAPE_INDEX[rows, placement]]
+        )
+        circled = (
+            surrounded(self.boards[play] != 0)[(slice(None),) + _MOUNTAINS]
+            & self.mountain_coins[play]
+        )
+        self.mountain_coins[play] &= ~circled
+        self.coins[play] = np.minimum(coins + circled.sum(axis=1), MAX_COINS)
+
+        live = np.flatnonzero(live)
+        self.timecost[live] += CARD_TIMECOST[self.card[live]]
+        ending = live[self.timecost[live] >= SEASON_TIME[self.season[live]]]
+        if len(ending):
+            self._end_season(ending)
+        drawing = live[~self.done[live]]
+        if len(drawing):
+            self._draw(drawing)
+
+        reward = self.score - previous_score
+        terminated = self.done.copy()
+        info = self._info()
+        if self.autoreset and terminated.any():
+            info["final_score"] = np.where(terminated, self.score, np.nan)
+            self._reset(np.flatnonzero(terminated))
+            info.update(self._info())
+        truncated = np.zeros(self.num_envs, dtype=bool)
+        return self._observation(), reward, terminated, truncated, info
+
+    def _end_season(self, idx):
+        boards = self.boards[idx]
+        season = self.season[idx]
+        edict_scores = np.zeros((len(idx), 2), dtype=np.int64)
+        for slot in range(2):
+            cards = self.edicts[idx, SEASON_EDICTS[season, slot]]
+            for card in np.unique(cards):
+                scored = cards == card
+                edict_scores[scored, slot] = SCORING[card].batch_score(boards[scored])
+        empty = boards == 0
+        penalty = np.count_nonzero(adjacent(boards == MONSTER) & empty, axis=(1, 2))
+        self.season_scores[idx, season] = np.column_stack(
+            [edict_scores, self.coins[idx], -penalty]
+        )
+        self.score[idx] += edict_scores.sum(axis=1) + self.coins[idx] - penalty
+        self.season[idx] += 1
+        self.done[idx] = self.season[idx] == len(SEASONS)
+        self._placements[idx[self.done[idx]]] = False
+        self.season[idx] = np.minimum(self.season[idx], len(SEASONS) - 1)
+        self.timecost[idx] = 0
+        self.draws[idx] = 0
+
+    def _observation(self):
+        return {
+            "board": self.boards.copy(),
+            "card": self._card_rows(),
+            "season": self.season.copy(),
+            "timecost": self.timecost.copy(),
+            "coins": self.coins.copy(),
+        }